@@ -1,236 +1,360 @@
-<<<<<<< Updated upstream
 
 import os
-import json
-from openai import OpenAI
-import pdfplumber
+import asyncio
+import functools
+import hashlib
+import itertools
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import httpx
+import orjson
+from openai import AsyncOpenAI, RateLimitError
 
 import auditsAndRecord
 
+# one OpenRouter key per line; requests are spread across all of them so the
+# run is not capped by a single key's rate limit
 with open("apikey.txt", "r", encoding="utf-8") as f:
-    API_KEY = f.read().strip()
+    API_KEYS = [line.strip() for line in f if line.strip()]
+if not API_KEYS:
+    raise RuntimeError("apikey.txt contains no API keys (expected one OpenRouter key per line)")
 
 
 PDF_DIR = "input_invoices"
 OUTPUT_DIR = "output_invoices"
 OUTPUT_AUDIT_FILE = "output_audit.txt"
-# store parsed filenames as a JSON array
+# parsed filenames are recorded by auditsAndRecord.record_parsed_file
 
 
 MODEL_NAME = "openai/gpt-4.1"
 TEMPERATURE = 0.4
+# upper bound on in-flight model requests
+MAX_CONCURRENCY = 16
+# "pdfplumber" (layout-aware, the default) or "pdfium" (faster, reading-order
+# text; opt-in since it needs pypdfium2 installed)
+EXTRACTOR = os.getenv("EXTRACTOR", "pdfplumber")
+
+# Exact-match response cache; responses sampled above this temperature are
+# too variable to be worth replaying, so they bypass the cache.
+LLM_CACHE_DIR = ".llm_cache"
+LLM_CACHE_TTL_S = 86400 * 7
+LLM_CACHE_MAX_TEMPERATURE = 0.5
+
+# Near-duplicate cache (reprints, same template re-run) keyed on an embedding
+# of the leading text. Opt-in: a false hit would copy one patient's fields
+# onto another patient's invoice, so only enable it for batches where that
+# risk is acceptable.
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE") == "1"
+SEMANTIC_CACHE_DIR = ".semantic_cache"
+SEMANTIC_CACHE_MIN_SIM = 0.97
+SEMANTIC_CACHE_PREFIX_CHARS = 2000
+SEMANTIC_CACHE_TTL_S = 86400
+
+# how long a key sits out after a 429, and how many keys to try per request
+RATE_LIMIT_COOLDOWN_S = 30.0
+MAX_RATE_LIMIT_RETRIES = 5
 
 invoice_formatting = "{title:Invoice,type:object,properties:{invoice_number:{type:string},patient_id:{type:string,},invoice_date:{type:string.format:mm-dd-yyyy,description:Date invoicewas issued},due_date:{type:string,format:mm-dd-yyyy},patient_name:{type:string},patient_age:{type:number},patient_address:{type:string,description:Patient mailing address NOT hospital address},patient_phone:{type:string,format:x-xxx-xxx-xxxx,description:Patient phone number NOT HOSPITAL PHONE},patient_email:{type:string,description:Patient email address NOT EMAIL OF HOSPITAL},admission_date:{type:string,format:mm-dd-yyyy},discharge_date:{type:string,format:mm-dd-yyyy},subtotal_amount:{type:number,minimum:0},discount_amount:{type:number,minimum:0},total_amount:{type:number,minimum:0},provider_name:{type:string,description:Name of the Doctor NOT THE NAME OF THE HOSPITAL},bed_id:{type:string},line_items:{type:array,description:List ofindividual line items on the invoice,items:{type:object,properties:{description:{type:string},code:{type:string},amount:{type:number,minimum:0}}}}}}"
 
+# The system prompt must stay byte-for-byte identical across files so the
+# provider's prompt-prefix cache can reuse it; per-file text only ever goes in
+# the user message.
+SYSTEM_PROMPT = "You are performing NER labeling on invoices. Extract the following fields in strict JSON format (no text outside JSON): " + invoice_formatting +". If a field is missing, set it to null. Use Common Sense when filling fields, for example info@whitepetalhospital.org would NOT be the patient email as it is clearly a hospital email."
 
-def is_parsed_file(filename: str) -> bool:
-    basename = os.path.splitext(filename)[0]
-    expected = os.path.join(OUTPUT_DIR, f"{basename}.json")
-    return os.path.isfile(expected)
+if MODEL_NAME.startswith("anthropic/"):
+    # Anthropic models only cache prefixes explicitly marked as cacheable
+    SYSTEM_MESSAGES = [{
+        "role": "system",
+        "content": [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
+    }]
+else:
+    # OpenAI / Gemini cache identical leading prefixes automatically
+    SYSTEM_MESSAGES = [{"role": "system", "content": SYSTEM_PROMPT}]
 
 
+def list_parsed_outputs() -> set:
+    """Names of the JSON outputs already in OUTPUT_DIR, read in one directory scan."""
+    if not os.path.isdir(OUTPUT_DIR):
+        return set()
+    with os.scandir(OUTPUT_DIR) as it:
+        return {e.name for e in it if e.name.endswith(".json")}
 
-def liteBot(messages, temperature=TEMPERATURE):
-    client = OpenAI(
+
+def _make_client(api_key: str) -> AsyncOpenAI:
+    # One client per key for the whole run so requests share pooled keep-alive
+    # connections instead of paying a fresh TCP+TLS handshake per PDF.
+    return AsyncOpenAI(
         base_url="https://openrouter.ai/api/v1",
-        api_key=API_KEY
+        api_key=api_key,
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+            timeout=120.0,
+        ),
     )
 
-    completion = client.chat.completions.create(
-        model=MODEL_NAME,
-        messages=messages,
-        temperature=temperature
+
+_CLIENTS = [_make_client(key) for key in API_KEYS]
+# monotonic time until which each key is backing off after a 429
+_COOLDOWN_UNTIL = [0.0] * len(_CLIENTS)
+_ROTATION = itertools.cycle(range(len(_CLIENTS)))
+
+
+async def _prewarm(client: AsyncOpenAI) -> None:
+    # cheap authenticated GET so the TCP+TLS handshake is done before the
+    # first PDF needs the connection
+    try:
+        await client.models.list()
+    except Exception:
+        pass
+
+
+def _next_client() -> int:
+    """Round-robin to the next key that is not cooling down."""
+    now = time.monotonic()
+    for _ in range(len(_CLIENTS)):
+        i = next(_ROTATION)
+        if _COOLDOWN_UNTIL[i] <= now:
+            return i
+    # every key is rate limited; use whichever frees up first
+    return min(range(len(_CLIENTS)), key=_COOLDOWN_UNTIL.__getitem__)
+
+
+try:
+    import diskcache
+    _LLM_CACHE = diskcache.Cache(LLM_CACHE_DIR)
+except ImportError:
+    _LLM_CACHE = None
+
+
+def _cache_key(messages, temperature) -> str:
+    h = hashlib.sha256()
+    h.update(MODEL_NAME.encode())
+    h.update(str(temperature).encode())
+    h.update(orjson.dumps(messages, option=orjson.OPT_SORT_KEYS))
+    return h.hexdigest()
+
+
+def _is_json_object(text) -> bool:
+    try:
+        return isinstance(orjson.loads(text), dict)
+    except (orjson.JSONDecodeError, TypeError):
+        return False
+
+
+def cached_llm(fn):
+    """Replay a stored response for an identical (model, temperature, prompt, text) request."""
+    @functools.wraps(fn)
+    async def wrapper(messages, temperature=TEMPERATURE):
+        if _LLM_CACHE is None or temperature > LLM_CACHE_MAX_TEMPERATURE:
+            return await fn(messages, temperature)
+        key = _cache_key(messages, temperature)
+        # diskcache is sqlite-backed and blocking; keep it off the event loop
+        hit = await asyncio.to_thread(_LLM_CACHE.get, key)
+        if hit is not None:
+            return hit
+        result = await fn(messages, temperature)
+        if _is_json_object(result):
+            # only replayable replies are stored; a malformed one is retried next run
+            await asyncio.to_thread(_LLM_CACHE.set, key, result, expire=LLM_CACHE_TTL_S)
+        return result
+    return wrapper
+
+
+@cached_llm
+async def liteBot_async(messages, temperature=TEMPERATURE):
+    for attempt in range(MAX_RATE_LIMIT_RETRIES):
+        i = _next_client()
+        wait = _COOLDOWN_UNTIL[i] - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            completion = await _CLIENTS[i].chat.completions.create(
+                model=MODEL_NAME,
+                messages=messages,
+                temperature=temperature,
+                # JSON mode: the reply is a single bare JSON object, no ``` fences
+                response_format={"type": "json_object"},
+            )
+        except RateLimitError:
+            # bench this key and steer the retry to a healthy one
+            _COOLDOWN_UNTIL[i] = time.monotonic() + RATE_LIMIT_COOLDOWN_S
+            if attempt == MAX_RATE_LIMIT_RETRIES - 1:
+                raise
+            continue
+        return completion.choices[0].message.content.strip()
+
+
+_SEMANTIC = None
+# lookups run in worker threads; only one of them may build the cache
+_SEMANTIC_LOCK = threading.Lock()
+
+
+def _semantic_cache():
+    """(embedder, collection) for the near-duplicate cache, built on first use."""
+    global _SEMANTIC
+    if _SEMANTIC is None:
+        with _SEMANTIC_LOCK:
+            if _SEMANTIC is None:
+                import chromadb
+                from fastembed import TextEmbedding
+
+                # a changed model or prompt gets a fresh collection, never stale answers
+                name = "invoices-" + hashlib.sha256((MODEL_NAME + SYSTEM_PROMPT).encode()).hexdigest()[:16]
+                client = chromadb.PersistentClient(path=SEMANTIC_CACHE_DIR)
+                collection = client.get_or_create_collection(name, metadata={"hnsw:space": "cosine"})
+                _SEMANTIC = (TextEmbedding("BAAI/bge-small-en-v1.5"), collection)
+    return _SEMANTIC
+
+
+def semantic_lookup(full_text: str):
+    """Return (embedding, cached_output or None) for the nearest stored invoice."""
+    embedder, collection = _semantic_cache()
+    vec = next(iter(embedder.embed([full_text[:SEMANTIC_CACHE_PREFIX_CHARS]]))).tolist()
+    if collection.count() == 0:
+        return vec, None
+    res = collection.query(query_embeddings=[vec], n_results=1,
+                           include=["documents", "distances", "metadatas"])
+    if not res["ids"][0]:
+        return vec, None
+    fresh = time.time() - res["metadatas"][0][0]["ts"] < SEMANTIC_CACHE_TTL_S
+    if fresh and 1.0 - res["distances"][0][0] >= SEMANTIC_CACHE_MIN_SIM:
+        return vec, res["documents"][0][0]
+    return vec, None
+
+
+def semantic_store(vec, full_text: str, outputJsonString: str) -> None:
+    _, collection = _semantic_cache()
+    collection.upsert(
+        ids=[hashlib.sha256(full_text.encode()).hexdigest()],
+        embeddings=[vec],
+        documents=[outputJsonString],
+        metadatas=[{"ts": time.time()}],
     )
-    return completion.choices[0].message.content.strip()
 
 
-# ------------------------
-# MAIN EXECUTION
-# ------------------------
+# column padding, blank-line runs and page footers are billable tokens that
+# carry nothing the model needs
+_RE_HSPACE = re.compile(r"[ \t]+")
+_RE_BLANK_LINES = re.compile(r"\n{3,}")
+_RE_PAGE_FOOTER = re.compile(r"^\s*Page \d+ of \d+\s*$", re.MULTILINE | re.IGNORECASE)
 
-for filename in os.listdir(PDF_DIR):
-    if not filename.lower().endswith(".pdf") or is_parsed_file(filename):
-        continue
 
-    pdf_path = os.path.join(PDF_DIR, filename)
-    print(f"Processing {filename}...")
-    
+def normalize_text(text: str) -> str:
+    text = _RE_PAGE_FOOTER.sub("", text)
+    text = _RE_HSPACE.sub(" ", text)
+    return _RE_BLANK_LINES.sub("\n\n", text).strip()
+
+
+def extract_pdf_text(pdf_path: str) -> str:
+    if EXTRACTOR == "pdfium":
+        return normalize_text(_extract_pdfium(pdf_path))
+    return normalize_text(_extract_pdfplumber(pdf_path))
+
+
+def _extract_pdfium(pdf_path: str) -> str:
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(pdf_path)
+    try:
+        # join straight from the page iterator so no per-page list is kept alive
+        return "\n\n".join(page.get_textpage().get_text_range() for page in pdf).strip()
+    finally:
+        pdf.close()
+
+
+def _extract_pdfplumber(pdf_path: str) -> str:
+    import pdfplumber
+
     with pdfplumber.open(pdf_path) as pdf:
         # Use layout-aware text extraction for better column handling
-        pages_text = [
-            page.extract_text(x_tolerance=2, y_tolerance=2) or "" 
+        return "\n\n".join(
+            page.extract_text(x_tolerance=2, y_tolerance=2) or ""
             for page in pdf.pages
-        ]
-    full_text = "\n\n".join(pages_text).strip()
+        ).strip()
 
 
+async def process_one(filename: str, sem: asyncio.Semaphore, pool: ProcessPoolExecutor) -> None:
+    pdf_path = os.path.join(PDF_DIR, filename)
+    print(f"Processing {filename}...")
 
-    system_prompt = "You are performing NER labeling on invoices. Extract the following fields in strict JSON format (no text outside JSON): " + invoice_formatting +". If a field is missing, set it to null. Use Common Sense when filling fields, for example info@whitepetalhospital.org would NOT be the patient email as it is clearly a hospital email."
-    
+    # extraction is CPU-bound; extract in a worker process so
+    # other PDFs keep extracting while earlier ones wait on the model
+    loop = asyncio.get_running_loop()
+    full_text = await loop.run_in_executor(pool, extract_pdf_text, pdf_path)
 
-    system = [{"role": "system", "content": system_prompt}]
-    user = [{"role": "user", "content": full_text}]
+    vec = cached = None
+    if SEMANTIC_CACHE:
+        vec, cached = await asyncio.to_thread(semantic_lookup, full_text)
 
-    try:
-        outputJsonString = liteBot(system + user, TEMPERATURE)
-    except Exception as e:
-        print(f"Error calling model for {filename}: {e}")
-        continue
-
-    cleaned = (
-        outputJsonString.strip()
-        .removeprefix("```json")
-        .removesuffix("```")
-        .strip()
-    )
+    if cached is not None:
+        print(f"Near-duplicate cache hit for {filename}")
+        outputJsonString = cached
+    else:
+        async with sem:
+            user = [{"role": "user", "content": full_text}]
+
+            try:
+                outputJsonString = await liteBot_async(SYSTEM_MESSAGES + user, TEMPERATURE)
+            except Exception as e:
+                print(f"Error calling model for {filename}: {e}")
+                return
 
     try:
-        parsed = json.loads(cleaned)
-    
-    except json.JSONDecodeError as e:
+        invoice_data = orjson.loads(outputJsonString)
+
+    except orjson.JSONDecodeError as e:
         print(f"Invalid JSON for {filename}: {e}")
         print("Raw output:\n", outputJsonString[:300], "...\n")
-        continue
+        return
 
-    if isinstance(parsed, list) and len(parsed) == 1:
-        invoice_data = parsed[0]
-    else:
-        invoice_data = parsed
+    if isinstance(invoice_data, list) and len(invoice_data) == 1:
+        invoice_data = invoice_data[0]
+    if not isinstance(invoice_data, dict):
+        print(f"Expected a JSON object for {filename}, got {type(invoice_data).__name__}")
+        print("Raw output:\n", outputJsonString[:300], "...\n")
+        return
+
+    if vec is not None and cached is None:
+        await asyncio.to_thread(semantic_store, vec, full_text, outputJsonString)
 
     # Analyze fields
-    fields_filled = [k for k, v in invoice_data.items() if v not in (None, "", [], {})]
-    fields_null = [k for k, v in invoice_data.items() if v in (None, "", [], {})]
-    
+    fields_filled, fields_null = auditsAndRecord.classify_fields(invoice_data)
+
 
     # Save output
     output_filename = os.path.join(OUTPUT_DIR, f"{os.path.splitext(filename)[0]}.json")
-    with open(output_filename, "w", encoding="utf-8") as f:
-        json.dump(invoice_data, f, indent=2, ensure_ascii=False)
+    with open(output_filename, "wb") as f:
+        f.write(orjson.dumps(invoice_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
     print(f"Saved {output_filename}")
 
     # Audit entry
-    auditsAndRecord.log_audit(filename, fields_filled, fields_null, system_prompt,outputJsonString)
-
-    # Record parsed files as a JSON array (creates file if missing)
-   
-=======
-
-
-
-API_KEY ="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"
-
-import os
-import json
-import pdfplumber
-from datetime import datetime
-from openai import OpenAI
-
-PDF_DIR = "input_invoices"
-OUTPUT_DIR = "output_invoices"
-OUTPUT_AUDIT_FILE = "output_audit.txt"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-MODEL_NAME = "google/gemma-3-4b-it"
-TEMPERATURE = 0.5
-
-invoice_formatting = (
-    "invoice_number: null, patient_id: null, invoice_date: null, due_date: null, "
-    "patient_name: null, patient_age: null, patient_address: null, patient_phone: null, "
-    "patient_email: null, admission_date: null, discharge_date: null, subtotal_amount: null, "
-    "discount_amount: null, total_amount: null, provider_name: null, bed_id: null, "
-    "line_items: [ { description: null, code: null, amount: null } ]"
-)
-
-
-def liteBot(messages, temperature=TEMPERATURE):
-    client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=API_KEY
-    )
-
-    completion = client.chat.completions.create(
-        model=MODEL_NAME,
-        messages=messages,
-        temperature=temperature
-    )
-
-    return completion.choices[0].message.content.strip()
-
-
-def log_audit(filename, fields_filled, fields_null, system_prompt):
-    """Append an audit record to the audit log."""
-    with open(OUTPUT_AUDIT_FILE, "a", encoding="utf-8") as audit:
-        audit.write("\n" + "=" * 60 + "\n")
-        audit.write(f"File: {filename}\n")
-        audit.write(f"Timestamp: {datetime.now().isoformat(timespec='seconds')}\n")
-        audit.write(f"Model: {MODEL_NAME}\n")
-        audit.write(f"Temperature: {TEMPERATURE}\n")
-        audit.write(f"System Prompt:\n{system_prompt}\n")
-        audit.write(f"Fields auto-filled ({len(fields_filled)}): {', '.join(fields_filled)}\n")
-        audit.write(f"Fields left blank ({len(fields_null)}): {', '.join(fields_null)}\n")
-        audit.write("=" * 60 + "\n\n")
-
-
-# ------------------------
-# MAIN EXECUTION
-# ------------------------
-for filename in os.listdir(PDF_DIR):
-    if not filename.lower().endswith(".pdf"):
-        continue
-
-    pdf_path = os.path.join(PDF_DIR, filename)
-    print(f"📄 Processing {filename}...")
-
-    with pdfplumber.open(pdf_path) as pdf:
-        pages_text = [page.extract_text() or "" for page in pdf.pages]
-    full_text = "\n\n".join(pages_text).strip()
-
-    system_prompt = (
-        "You are performing NER labeling on invoices. Extract the following fields "
-        "in strict JSON format (no text outside JSON): " + invoice_formatting +
-        ". If a field is missing, set it to null. The 'Provider Name' is the name of the Doctor and not the hospital."
-    )
-
-    system = [{"role": "system", "content": system_prompt}]
-    user = [{"role": "user", "content": full_text}]
-
-    try:
-        outputJsonString = liteBot(system + user, TEMPERATURE)
-    except Exception as e:
-        print(f"Error calling model for {filename}: {e}")
-        continue
-
-    cleaned = (
-        outputJsonString.strip()
-        .removeprefix("```json")
-        .removesuffix("```")
-        .strip()
-    )
-
-    try:
-        parsed = json.loads(cleaned)
-    except json.JSONDecodeError as e:
-        print(f"Invalid JSON for {filename}: {e}")
-        print("Raw output:\n", outputJsonString[:300], "...\n")
-        continue
-
-    if isinstance(parsed, list) and len(parsed) == 1:
-        invoice_data = parsed[0]
-    else:
-        invoice_data = parsed
-
-    # Analyze fields
-    fields_filled = [k for k, v in invoice_data.items() if v not in (None, "", [], {})]
-    fields_null = [k for k, v in invoice_data.items() if v in (None, "", [], {})]
-
-    # Save output
-    output_filename = os.path.join(OUTPUT_DIR, f"invoice_{os.path.splitext(filename)[0]}.json")
-    with open(output_filename, "w", encoding="utf-8") as f:
-        json.dump(invoice_data, f, indent=2, ensure_ascii=False)
-
-    print(f"Saved {output_filename}")
-
-    # Audit entry
-    log_audit(filename, fields_filled, fields_null, system_prompt)
->>>>>>> Stashed changes
+    auditsAndRecord.log_audit(filename, fields_filled, fields_null, SYSTEM_PROMPT,outputJsonString)
+
+    # Record parsed files in the append-only log (creates file if missing)
+    auditsAndRecord.record_parsed_file(auditsAndRecord.FILES_PAUSED_LOG, filename)
+
+
+async def parse_async() -> None:
+    warmups = [asyncio.create_task(_prewarm(c)) for c in _CLIENTS]
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    parsed = list_parsed_outputs()
+    with os.scandir(PDF_DIR) as it:
+        pdf_files = [
+            e.name for e in it
+            if e.is_file() and e.name.lower().endswith(".pdf")
+            and os.path.splitext(e.name)[0] + ".json" not in parsed
+        ]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        await asyncio.gather(*[process_one(fn, sem, pool) for fn in pdf_files])
+    await asyncio.gather(*warmups)
+
+
+# ------------------------
+# MAIN EXECUTION
+# ------------------------
+
+if __name__ == "__main__":
+    asyncio.run(parse_async())
@@ -3,27 +3,38 @@
 import os
 import shutil
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 OUTPUT_DIR = "output_invoices"
 OUTPUT_AUDIT_FILE = "output_audit.txt"
 ARCHIVE_DIR = "archives"
+# cross-device archives fall back to copying; overlap that IO across threads
+IO_WORKERS = 16
+# last archive name handed out, e.g. 'Oct20#2', so resets don't rescan archive_dir
+COUNTER_FILE = ".counter"
 
 
-def reset_output(audit_path: str = OUTPUT_AUDIT_FILE, out_dir: str = OUTPUT_DIR, archive_dir: str = ARCHIVE_DIR) -> None:
-    """Archive the contents of out_dir and then remove them.
+def _copy_pair(pair):
+    src, dst = pair
+    shutil.copy2(src, dst)
 
-    - Creates `archive_dir` if missing.
-    - Creates a zip file named `<timestamp>.zip` inside `archive_dir` containing the current contents of `out_dir`.
-    - Overwrites the audit file with a short header and records the archive path and removed items.
-    - Clears all files and subdirectories inside `out_dir`.
-    """
 
-    # Build archive directory name like 'Oct20#2'
-    now = datetime.datetime.utcnow()
-    timestamp = now.strftime("%Y%m%dT%H%M%SZ")
-    month_day = now.strftime("%b%d")  # e.g. 'Oct20'
-    # find next counter for this date
-    os.makedirs(archive_dir, exist_ok=True)
+def _remove_entry(full_path):
+    try:
+        if os.path.isfile(full_path) or os.path.islink(full_path):
+            os.unlink(full_path)
+            return (full_path, "file")
+        elif os.path.isdir(full_path):
+            shutil.rmtree(full_path)
+            return (full_path, "dir")
+    except Exception as e:
+        # record failures in removed list as errors
+        return (full_path, f"error: {e}")
+    return None
+
+
+def _scan_archive_counter(archive_dir: str, month_day: str) -> int:
+    """Highest '#N' suffix among archive folders for month_day (0 if none)."""
     existing = [d for d in os.listdir(archive_dir) if os.path.isdir(os.path.join(archive_dir, d)) and d.startswith(month_day)]
     # parse suffix numbers
     counters = []
@@ -33,41 +44,86 @@ def reset_output(audit_path: str = OUTPUT_AUDIT_FILE, out_dir: str = OUTPUT_DIR,
             counters.append(int(suffix))
         except Exception:
             continue
-    next_counter = max(counters) + 1 if counters else 1
-    archive_name = os.path.join(archive_dir, f"{month_day}#{next_counter}")
+    return max(counters) if counters else 0
 
-    # Copy contents of out_dir into archive_name directory, preserving relative paths
-    if os.path.exists(archive_name):
-        shutil.rmtree(archive_name)
+
+def _next_archive_counter(archive_dir: str, month_day: str) -> int:
+    """Read, bump and atomically rewrite the archive counter marker.
+
+    Falls back to scanning archive_dir when the marker is missing or unreadable,
+    or when the stored counter would collide with an existing folder.
+    """
+    counter_path = os.path.join(archive_dir, COUNTER_FILE)
+    try:
+        with open(counter_path, "r", encoding="utf-8") as f:
+            last_day, last = f.read().strip().split("#", 1)
+        next_counter = (int(last) if last_day == month_day else 0) + 1
+        if os.path.exists(os.path.join(archive_dir, f"{month_day}#{next_counter}")):
+            next_counter = _scan_archive_counter(archive_dir, month_day) + 1
+    except (OSError, ValueError):
+        next_counter = _scan_archive_counter(archive_dir, month_day) + 1
+
+    tmp_path = counter_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(f"{month_day}#{next_counter}")
+    os.replace(tmp_path, counter_path)
+    return next_counter
+
+
+def _copy_then_clear(out_dir: str, archive_name: str) -> list:
+    """Copy out_dir into archive_name, preserving relative paths, then empty out_dir."""
     os.makedirs(archive_name, exist_ok=True)
+    pairs = []
     for root, dirs, files in os.walk(out_dir):
         rel_root = os.path.relpath(root, out_dir)
         target_root = archive_name if rel_root == "." else os.path.join(archive_name, rel_root)
         os.makedirs(target_root, exist_ok=True)
         for file in files:
-            src = os.path.join(root, file)
-            dst = os.path.join(target_root, file)
-            shutil.copy2(src, dst)
+            pairs.append((os.path.join(root, file), os.path.join(target_root, file)))
 
-    removed = []
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as pool:
+        # shutil.copy2 already uses os.sendfile on Linux; list() surfaces copy errors
+        list(pool.map(_copy_pair, pairs))
+
+        # Remove all files and directories inside output directory
+        entries = [os.path.join(out_dir, name) for name in os.listdir(out_dir)]
+        return [r for r in pool.map(_remove_entry, entries) if r is not None]
+
+
+def reset_output(audit_path: str = OUTPUT_AUDIT_FILE, out_dir: str = OUTPUT_DIR, archive_dir: str = ARCHIVE_DIR) -> None:
+    """Archive the contents of out_dir and then remove them.
+
+    - Creates `archive_dir` if missing.
+    - Creates a zip file named `<timestamp>.zip` inside `archive_dir` containing the current contents of `out_dir`.
+    - Overwrites the audit file with a short header and records the archive path and removed items.
+    - Clears all files and subdirectories inside `out_dir`.
+    """
+
+    # Build archive directory name like 'Oct20#2'
+    now = datetime.datetime.utcnow()
+    timestamp = now.strftime("%Y%m%dT%H%M%SZ")
+    month_day = now.strftime("%b%d")  # e.g. 'Oct20'
+    # find next counter for this date
+    os.makedirs(archive_dir, exist_ok=True)
+    next_counter = _next_archive_counter(archive_dir, month_day)
+    archive_name = os.path.join(archive_dir, f"{month_day}#{next_counter}")
+
+    if os.path.exists(archive_name):
+        shutil.rmtree(archive_name)
 
     # Ensure output directory exists; if not, create it so the rest of the system can rely on it
     if not os.path.exists(out_dir):
         os.makedirs(out_dir, exist_ok=True)
 
-    # Remove all files and directories inside output directory
-    for name in os.listdir(out_dir):
-        full_path = os.path.join(out_dir, name)
-        try:
-            if os.path.isfile(full_path) or os.path.islink(full_path):
-                os.unlink(full_path)
-                removed.append((full_path, "file"))
-            elif os.path.isdir(full_path):
-                shutil.rmtree(full_path)
-                removed.append((full_path, "dir"))
-        except Exception as e:
-            # record failures in removed list as errors
-            removed.append((full_path, f"error: {e}"))
+    if os.stat(out_dir).st_dev == os.stat(archive_dir).st_dev:
+        # Same filesystem: renaming the whole directory archives it in one
+        # metadata operation instead of copying and deleting every file
+        with os.scandir(out_dir) as it:
+            removed = [(e.path, "dir" if e.is_dir(follow_symlinks=False) else "file") for e in it]
+        shutil.move(out_dir, archive_name)
+        os.makedirs(out_dir, exist_ok=True)
+    else:
+        removed = _copy_then_clear(out_dir, archive_name)
 
     # Write audit header, archive path, and removed items
     with open(audit_path, "w", encoding="utf-8") as audit:
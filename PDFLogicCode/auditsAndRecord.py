@@ -1,6 +1,7 @@
 
 import os
-import json
+import atexit
+import orjson
 from datetime import datetime
 from openai import OpenAI
 
@@ -9,79 +10,114 @@ OUTPUT_AUDIT_FILE="output_audit.txt"
 MODEL_NAME="openai/gpt-5"
 TEMPERATURE=0.4
 FILES_PAUSED = "filesPaursed.json"
+# append-only, one filename per line; compact() turns it into FILES_PAUSED
+FILES_PAUSED_LOG = "filesPaursed.log"
+AUDIT_BUFFER_SIZE = 1 << 20
+
+_AUDIT_FH = None
+_PARSED_NAMES = {}
+
+
+def _audit_fh():
+    """Open the audit log once per process with a large write buffer."""
+    global _AUDIT_FH
+    if _AUDIT_FH is None:
+        _AUDIT_FH = open(OUTPUT_AUDIT_FILE, "a", encoding="utf-8", buffering=AUDIT_BUFFER_SIZE)
+        atexit.register(_AUDIT_FH.close)
+    return _AUDIT_FH
+
+def _parsed_names(log_path: str, seed_path: str = FILES_PAUSED) -> set:
+    """Filenames already recorded in `log_path`, read from disk once per process.
+
+    If the log does not exist yet, it is seeded from the JSON array at
+    `seed_path` so files recorded before the log format are not re-parsed.
+    """
+    names = _PARSED_NAMES.get(log_path)
+    if names is None:
+        names = set()
+        if os.path.exists(log_path):
+            with open(log_path, "r", encoding="utf-8") as f:
+                names.update(line.rstrip("\n") for line in f if line.strip())
+        elif os.path.exists(seed_path):
+            with open(seed_path, "rb") as f:
+                names.update(orjson.loads(f.read()))
+            if names:
+                with open(log_path, "w", encoding="utf-8") as f:
+                    f.writelines(name + "\n" for name in sorted(names))
+        _PARSED_NAMES[log_path] = names
+    return names
+
 
 def record_parsed_file(paused_path: str, filename: str) -> None:
-    """Record `filename` into a JSON array at `paused_path` (create if missing).
+    """Append `filename` as one line to the log at `paused_path` (create if missing).
     Non-fatal: prints a warning on failure.
     """
     try:
-        if os.path.exists(paused_path):
-            with open(paused_path, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                    if not isinstance(data, list):
-                        data = []
-                except json.JSONDecodeError:
-                    data = []
-        else:
-            data = []
-
-        if filename not in data:
-            data.append(filename)
-            with open(paused_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+        names = _parsed_names(paused_path)
+        if filename not in names:
+            with open(paused_path, "a", encoding="utf-8", buffering=1 << 16) as f:
+                f.write(filename + "\n")
+            names.add(filename)
     except Exception as e:
         print(f"Warning: failed to record parsed file {filename}: {e}")
 
 
+def compact(log_path: str = FILES_PAUSED_LOG, json_path: str = FILES_PAUSED) -> None:
+    """Collapse the parsed-files log into a JSON array at `json_path`."""
+    names = sorted(_parsed_names(log_path))
+    with open(json_path, "wb") as f:
+        f.write(orjson.dumps(names, option=orjson.OPT_INDENT_2))
+
+
+def classify_fields(invoice_data: dict):
+    """Split keys into (filled, null) in one pass; None, "", [] and {} count as null."""
+    filled, null = [], []
+    for k, v in invoice_data.items():
+        if v is None or v == "" or (isinstance(v, (list, dict)) and not v):
+            null.append(k)
+        else:
+            filled.append(k)
+    return filled, null
+
+
 def log_audit(filename, fields_filled, fields_null, system_prompt, outputJsonString):
     """Append an audit record to the audit log."""
-    with open(OUTPUT_AUDIT_FILE, "a", encoding="utf-8") as audit:
-        audit.write("\n" + "=" * 60 + "\n")
-        audit.write(f"File: {filename}\n")
-        audit.write(f"Timestamp: {datetime.now().isoformat(timespec='seconds')}\n")
-        audit.write(f"Model: {MODEL_NAME}\n")
-        audit.write(f"Temperature: {TEMPERATURE}\n")
-        audit.write(f"System Prompt:\n{system_prompt}\n")
-        audit.write(f"Fields auto-filled ({len(fields_filled)}): {', '.join(fields_filled)}\n")
-        audit.write(f"Fields left blank ({len(fields_null)}): {', '.join(fields_null)}\n")
-        audit.write(f"Raw output:\n{outputJsonString}\n")
-        audit.write("=" * 60 + "\n\n")
-
-        cleaned = (
-            outputJsonString.strip()
-            .removeprefix("```json")
-            .removesuffix("```")
-            .strip()
-        )
-
-        try:
-            parsed = json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            print(f"Invalid JSON for {filename}: {e}")
-            print("Raw output:\n", outputJsonString[:1000], "...\n")
-            return
-
-        if isinstance(parsed, list) and len(parsed) == 1:
-            invoice_data = parsed[0]
-        else:
-            invoice_data = parsed
-
-        if not isinstance(invoice_data, dict):
-            print(f"Unexpected parsed structure for {filename}: expected object, got {type(invoice_data)}")
-            return
-
-        fields_filled = [k for k, v in invoice_data.items() if v not in (None, "", [], {})]
-        fields_null = [k for k, v in invoice_data.items() if v in (None, "", [], {})]
-        
-
-        output_filename = os.path.join(OUTPUT_DIR, f"{os.path.splitext(filename)[0]}.json")
-        try:
-            with open(output_filename, "w", encoding="utf-8") as f:
-                json.dump(invoice_data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Failed to write {output_filename}: {e}")
-            return
+    sep = "=" * 60
+    record = (
+        f"\n{sep}\n"
+        f"File: {filename}\n"
+        f"Timestamp: {datetime.now().isoformat(timespec='seconds')}\n"
+        f"Model: {MODEL_NAME}\n"
+        f"Temperature: {TEMPERATURE}\n"
+        f"System Prompt:\n{system_prompt}\n"
+        f"Fields auto-filled ({len(fields_filled)}): {', '.join(fields_filled)}\n"
+        f"Fields left blank ({len(fields_null)}): {', '.join(fields_null)}\n"
+        f"Raw output:\n{outputJsonString}\n"
+        f"{sep}\n\n"
+    )
+    _audit_fh().write(record)
+
+    try:
+        invoice_data = orjson.loads(outputJsonString)
+    except orjson.JSONDecodeError as e:
+        print(f"Invalid JSON for {filename}: {e}")
+        print("Raw output:\n", outputJsonString[:1000], "...\n")
+        return
+
+    if not isinstance(invoice_data, dict):
+        print(f"Unexpected parsed structure for {filename}: expected object, got {type(invoice_data)}")
+        return
+
+    fields_filled, fields_null = classify_fields(invoice_data)
+    
+
+    output_filename = os.path.join(OUTPUT_DIR, f"{os.path.splitext(filename)[0]}.json")
+    try:
+        with open(output_filename, "wb") as f:
+            f.write(orjson.dumps(invoice_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    except Exception as e:
+        print(f"Failed to write {output_filename}: {e}")
+        return
 
 
 
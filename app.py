@@ -1,21 +1,50 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from starlette.responses import JSONResponse
-from parser_prototype import parse_pdf_bytes
+from fastapi.responses import ORJSONResponse
+from parser_prototype import parse_pdf_path
+from typing import Any, Dict
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import uvicorn # Not strictly required, but good for context
 
+# Uploads are copied to a temp file in chunks rather than read whole.
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Parsing is CPU-bound; run it in worker processes so concurrent uploads
+# parse in parallel and the event loop stays free to accept new ones.
+EXECUTOR = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+# Results of recent successful parses keyed by a blake2b digest of the PDF, so
+# re-uploads and retries of the same file skip the parser. Only touched from
+# the event loop, so no lock is needed.
+PARSE_CACHE_SIZE = 256
+_parse_cache: "OrderedDict[bytes, dict]" = OrderedDict()
+
 # Initialize the FastAPI application
 app = FastAPI(
     title="Medical Document Parser API",
-    description="An API to extract key data from medical invoices."
+    description="An API to extract key data from medical invoices.",
+    # orjson encodes the (line-item heavy) parser output much faster than stdlib json
+    default_response_class=ORJSONResponse,
 )
 
+# Parser-only: the DB-backed /v1 routes live on main.py's app, so this image
+# never imports psycopg2/dotenv/great_expectations or exposes those endpoints.
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    EXECUTOR.shutdown(wait=False)
+
 @app.get("/", include_in_schema=False)
 def read_root():
     """Simple health check endpoint."""
     return {"status": "Parser API is running"}
 
 
-@app.post("/parse/invoice")
+@app.post("/parse/invoice", response_model=Dict[str, Any])
 async def parse_uploaded_invoice(file: UploadFile = File(...)):
     """
     Accepts a PDF file upload, processes it using the parser_prototype, 
@@ -30,17 +59,35 @@ async def parse_uploaded_invoice(file: UploadFile = File(...)):
         )
 
     try:
-        # 2. Read the file content as bytes
-        # Since this is an async function, use await for file reading
-        pdf_bytes = await file.read()
-        
-        # 3. Call the refactored parser function
-        extracted_data = parse_pdf_bytes(pdf_bytes)
+        # 2. Stream the upload to a temp file instead of one big bytes object;
+        # workers get the path, so the PDF is never pickled across processes
+        fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            digest = hashlib.blake2b(digest_size=16)
+            with os.fdopen(fd, "wb") as tmp:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            key = digest.digest()
+
+            extracted_data = _parse_cache.get(key)
+            if extracted_data is not None:
+                _parse_cache.move_to_end(key)
+            else:
+                # 3. Call the refactored parser function in the process pool
+                loop = asyncio.get_running_loop()
+                extracted_data = await loop.run_in_executor(EXECUTOR, parse_pdf_path, pdf_path)
+                if "error" not in extracted_data:
+                    _parse_cache[key] = extracted_data
+                    if len(_parse_cache) > PARSE_CACHE_SIZE:
+                        _parse_cache.popitem(last=False)
+        finally:
+            os.unlink(pdf_path)
 
         # 4. Return the result
         if "error" in extracted_data:
             # If the parser returned an internal error
-            return JSONResponse(status_code=500, content=extracted_data)
+            return ORJSONResponse(status_code=500, content=extracted_data)
         
         return extracted_data
 
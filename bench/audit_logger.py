@@ -2,13 +2,29 @@
 Audit Logger for Caldarium Intake Agent
 Tracks all parsing operations for compliance and debugging
 """
-import json
-import hashlib
-from datetime import datetime, timezone
+import atexit
+import secrets
+import threading
+import time
+import weakref
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, Any, Optional, List
+import orjson
 import pandas as pd
 
+# Entries between explicit flushes of the buffered log handle
+FLUSH_EVERY = 256
+
+# Loggers still open, closed by one exit hook; weak so dropped loggers can be freed
+_open_loggers: "weakref.WeakSet[AuditLogger]" = weakref.WeakSet()
+
+@atexit.register
+def _close_open_loggers() -> None:
+    for logger in list(_open_loggers):
+        logger.close()
+
 class AuditLogger:
     def __init__(self, log_file: str = "audit_log.jsonl", run_id: Optional[str] = None):
         """
@@ -21,12 +37,23 @@ class AuditLogger:
         self.log_file = Path(log_file)
         self.run_id = run_id or self._generate_run_id()
         self.logs = []
+        # Wall-clock anchor; entry timestamps are offsets from it via time_ns()
+        self._t0_ns = time.time_ns()
+        self._t0_dt = datetime.fromtimestamp(self._t0_ns / 1e9, timezone.utc)
+        self._lock = threading.Lock()
+        self._pending = 0
+        # One append handle for the logger's lifetime instead of open/close per
+        # entry, opened on the first write so an unused logger touches no file
+        self._fh = None
     
     def _generate_run_id(self) -> str:
-        """Generate a unique run ID based on timestamp and config"""
-        timestamp = datetime.now(timezone.utc).isoformat()
-        config_hash = hashlib.md5(timestamp.encode()).hexdigest()[:8]
-        return f"run_{config_hash}"
+        """Generate a unique run ID (8 random hex chars)"""
+        return f"run_{secrets.token_hex(4)}"
+    
+    def _timestamp(self) -> str:
+        """UTC ISO timestamp for now, without a tz-aware datetime.now() per call"""
+        delta_us = (time.time_ns() - self._t0_ns) // 1000
+        return (self._t0_dt + timedelta(microseconds=delta_us)).isoformat()
     
     def log_operation(self, 
                      doc_id: str,
@@ -46,7 +73,7 @@ class AuditLogger:
         """
         log_entry = {
             "doc_id": doc_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": self._timestamp(),
             "stage": stage,
             "error_type": error_type,
             "details": details,
@@ -54,11 +81,33 @@ class AuditLogger:
             "run_id": self.run_id
         }
         
-        self.logs.append(log_entry)
-        
-        # Write to file immediately (for real-time monitoring)
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        line = orjson.dumps(log_entry, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+        with self._lock:
+            self.logs.append(log_entry)
+            if self._fh is None:
+                self._fh = open(self.log_file, "ab", buffering=1 << 16)
+                _open_loggers.add(self)
+            self._fh.write(line)
+            self._pending += 1
+        self.flush()
+    
+    def flush(self, force: bool = False) -> None:
+        """Flush buffered entries to disk (every FLUSH_EVERY entries unless forced)"""
+        with self._lock:
+            if self._fh is None or self._fh.closed or not (force or self._pending >= FLUSH_EVERY):
+                return
+            self._fh.flush()
+            self._pending = 0
+    
+    def close(self) -> None:
+        """Flush and close the log file"""
+        self.flush(force=True)
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                # a later write reopens the file instead of hitting a closed handle
+                self._fh = None
+            _open_loggers.discard(self)
     
     def log_success(self, doc_id: str, stage: str, details: Dict[str, Any]) -> None:
         """Log a successful operation"""
@@ -85,32 +134,59 @@ class AuditLogger:
         if not self.logs:
             return {}
         
-        df = self.get_logs_df()
+        # Single pass over the entries; no DataFrame needed for counts
+        error_counts, stage_counts, resolution_counts = Counter(), Counter(), Counter()
+        docs = set()
+        total_time = 0
+        for entry in self.logs:
+            error_counts[entry["error_type"]] += 1
+            stage_counts[entry["stage"]] += 1
+            resolution_counts[entry["resolution"]] += 1
+            docs.add(entry["doc_id"])
+            details = entry["details"]
+            if isinstance(details, dict):
+                total_time += details.get("processing_time_ms", 0)
         
+        n = len(self.logs)
         return {
             "run_id": self.run_id,
-            "total_operations": len(df),
-            "success_rate": len(df[df["error_type"] == "SUCCESS"]) / len(df) if len(df) > 0 else 0,
-            "error_counts": df["error_type"].value_counts().to_dict(),
-            "stage_counts": df["stage"].value_counts().to_dict(),
-            "resolution_counts": df["resolution"].value_counts().to_dict(),
-            "unique_documents": df["doc_id"].nunique(),
-            "avg_processing_time": df["details"].apply(
-                lambda x: x.get("processing_time_ms", 0) if isinstance(x, dict) else 0
-            ).mean()
+            "total_operations": n,
+            "success_rate": error_counts["SUCCESS"] / n,
+            "error_counts": dict(error_counts.most_common()),
+            "stage_counts": dict(stage_counts.most_common()),
+            "resolution_counts": dict(resolution_counts.most_common()),
+            "unique_documents": len(docs),
+            "avg_processing_time": total_time / n
         }
 
-# Global audit logger instance
-audit_logger = AuditLogger()
+# Default logger, created on first use so importing this module does not
+# create audit_log.jsonl in the caller's working directory
+_default_logger: Optional[AuditLogger] = None
+
+def get_audit_logger() -> AuditLogger:
+    """Return the process-wide default AuditLogger, creating it on first call"""
+    global _default_logger
+    if _default_logger is None:
+        _default_logger = AuditLogger()
+    return _default_logger
 
 def log_parsing_operation(doc_id: str, stage: str, error_type: str, details: Dict[str, Any]):
     """Convenience function for logging parsing operations"""
-    audit_logger.log_operation(doc_id, stage, error_type, details)
+    get_audit_logger().log_operation(doc_id, stage, error_type, details)
 
 def log_parsing_success(doc_id: str, stage: str, details: Dict[str, Any]):
     """Convenience function for logging successful operations"""
-    audit_logger.log_success(doc_id, stage, details)
+    get_audit_logger().log_success(doc_id, stage, details)
 
 def log_parsing_error(doc_id: str, stage: str, error_type: str, details: Dict[str, Any]):
     """Convenience function for logging errors"""
-    audit_logger.log_error(doc_id, stage, error_type, details)
+    get_audit_logger().log_error(doc_id, stage, error_type, details)
+
+def log_parsing_result(doc_id: str, stage: str, details: Dict[str, Any], missing_fields=()):
+    """Log success, or a MISSING_FIELD error when any required field is missing"""
+    if missing_fields:
+        # a copy, so the caller's dict is left as it was passed in
+        details = {**details, "missing_fields": list(missing_fields)}
+        get_audit_logger().log_error(doc_id, stage, "MISSING_FIELD", details)
+    else:
+        get_audit_logger().log_success(doc_id, stage, details)
@@ -15,7 +15,9 @@ Improvements:
 
 import pandas as pd
 import json
+import math
 import numpy as np
+import os
 import sys
 import hashlib
 import platform
@@ -24,6 +26,15 @@ from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
 import warnings
 import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field as dc_field
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # stdlib json still works, just slower
+    orjson = None
 
 warnings.filterwarnings("ignore")
 
@@ -34,6 +45,28 @@ np.random.seed(RANDOM_SEED)
 HERE = Path(__file__).resolve().parent
 
 
+def _read_json(path: Path):
+    """Parse a JSON file from its raw bytes (orjson when available)."""
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _load_one(path: Path):
+    """(parsed, None) on success, (None, exc) on failure; safe to run in a thread."""
+    try:
+        return _read_json(path), None
+    except Exception as e:
+        return None, e
+
+
+def _load_all(paths: List[Path]):
+    """Read many small JSON files concurrently, preserving input order."""
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as ex:
+        return list(ex.map(_load_one, paths))
+
+
 # ------------------------------------------------------------------------------
 # Config
 # ------------------------------------------------------------------------------
@@ -53,26 +86,78 @@ class BenchmarkConfig:
         self.test_documents: Optional[List[str]] = None
         self.parser_suffix = "_regex.json"
 
+        # Per-document raw values in the JSON output; off by default since
+        # they duplicate whole line_items payloads for every field
+        self.keep_document_results = False
+
         self.fields_to_evaluate = [
             "invoice_number", "due_date", "patient_name", "subtotal_amount",
             "invoice_date", "total_amount", "line_items"
         ]
 
 
+@dataclass(slots=True)
+class FieldResult:
+    """Counters and scores for one evaluated field (asdict() for JSON)."""
+    field: str
+    total_documents: int = 0
+    gt_present: int = 0
+    parser_present: int = 0
+    both_present: int = 0
+    matches: int = 0
+    document_results: list = dc_field(default_factory=list)
+    precision: float = 0.0
+    recall: float = 0.0
+    f1_score: float = 0.0
+
+
 # ------------------------------------------------------------------------------
 # Field comparator
 # ------------------------------------------------------------------------------
 
+# single-pass deletion tables for str.translate
+_DATE_STRIP = str.maketrans('', '', '-/')
+_MONEY_STRIP = str.maketrans('', '', '$,')
+
+_NUMERIC_FIELDS = frozenset({"subtotal_amount", "total_amount", "discount_amount", "patient_age"})
+_DATE_FIELDS = frozenset({"invoice_date", "due_date", "admission_date", "discharge_date"})
+
+# Comparison rule per field once exact equality fails; unlisted fields are "str"
+_FIELD_KIND = {**dict.fromkeys(_NUMERIC_FIELDS, "num"), **dict.fromkeys(_DATE_FIELDS, "date")}
+
+
+# Presence check per exact JSON type; anything else goes to _has_value_fallback
+_HAS_VALUE = {
+    type(None): lambda v: False,
+    str: lambda v: v.strip() != '',
+    list: bool,
+    tuple: bool,
+    dict: bool,
+    bool: lambda v: True,
+    int: lambda v: True,
+    float: lambda v: v == v,  # False only for NaN
+}
+
+
+@lru_cache(maxsize=8192, typed=True)
+def _normalize_hashable(value) -> str:
+    # typed=True so 1, 1.0 and True stay distinct ("1", "1.0", "true")
+    return str(value).strip().lower()
+
+
 class FieldComparator:
     """Compare and normalize field values."""
 
     @staticmethod
     def normalize_value(value):
-        if pd.isna(value) or value is None:
+        if value is None:
+            return None
+        if isinstance(value, float) and value != value:  # NaN
             return None
-        if isinstance(value, str):
-            return value.strip().lower()
-        return str(value).strip().lower()
+        try:
+            return _normalize_hashable(value)
+        except TypeError:  # unhashable (list/dict): not worth caching
+            return str(value).strip().lower()
 
     @staticmethod
     def compare_scalar_field(gt_value, parser_value, field_name):
@@ -89,30 +174,67 @@ class FieldComparator:
         if gt_norm == parser_norm:
             return True, "exact_match"
 
-        numeric_fields = ['subtotal_amount', 'total_amount', 'discount_amount', 'patient_age']
-        if field_name in numeric_fields:
-            try:
-                gt_num = float(str(gt_norm).replace('$', '').replace(',', ''))
-                parser_num = float(str(parser_norm).replace('$', '').replace(',', ''))
-                if abs(gt_num - parser_num) < 0.01:
-                    return True, "numeric_match"
-            except Exception:
-                pass
-
-        date_fields = ['invoice_date', 'due_date', 'admission_date', 'discharge_date']
-        if field_name in date_fields:
-            try:
-                gt_date = str(gt_norm).replace('-', '').replace('/', '')
-                parser_date = str(parser_norm).replace('-', '').replace('/', '')
-                if gt_date == parser_date:
-                    return True, "date_match"
-            except Exception:
-                pass
+        kind = _FIELD_KIND.get(field_name, "str")
+        if kind == "num":
+            return FieldComparator._compare_num(gt_norm, parser_norm)
+        if kind == "date":
+            return FieldComparator._compare_date(gt_norm, parser_norm)
+        return FieldComparator._compare_str(gt_norm, parser_norm)
+
+    # Kind-specific rules for normalized, present, not-exactly-equal values;
+    # normalize_value only ever returns str here, so no str() wrapping needed
+
+    @staticmethod
+    def _compare_num(gt_norm, parser_norm):
+        try:
+            gt_num = float(gt_norm.translate(_MONEY_STRIP))
+            parser_num = float(parser_norm.translate(_MONEY_STRIP))
+        except ValueError:
+            return False, "mismatch"
+        if abs(gt_num - parser_num) < 0.01:
+            return True, "numeric_match"
+        return False, "mismatch"
+
+    @staticmethod
+    def _compare_date(gt_norm, parser_norm):
+        if gt_norm.translate(_DATE_STRIP) == parser_norm.translate(_DATE_STRIP):
+            return True, "date_match"
+        return False, "mismatch"
 
+    @staticmethod
+    def _compare_str(gt_norm, parser_norm):
+        # plain strings have no looser rule than the exact match already tried
         return False, "mismatch"
 
     @staticmethod
-    def compare_line_items(gt_items, parser_items):
+    def normalize_items(items):
+        # (code, description, amount in cents) tuples are hashable, so
+        # items can be matched through a Counter instead of a nested scan
+        normalized = []
+        for item in items or ():
+            if isinstance(item, dict):
+                raw = item.get("amount", "")
+                if type(raw) in (int, float):
+                    # JSON amounts are usually numbers already; skip the str round-trip
+                    amt = float(raw)
+                else:
+                    try:
+                        amt = float(str(raw).translate(_MONEY_STRIP))
+                    except Exception:
+                        amt = 0.0
+                if not math.isfinite(amt):
+                    # "nan"/"inf" cannot be converted to cents
+                    amt = 0.0
+                normalized.append((
+                    FieldComparator.normalize_value(item.get("code", "")),
+                    FieldComparator.normalize_value(item.get("description", "")),
+                    int(round(amt * 100)),
+                ))
+        return normalized
+
+    @staticmethod
+    def compare_line_items(gt_items, parser_items, gt_norm=None, pr_norm=None):
+        """gt_norm/pr_norm may carry pre-computed normalize_items() results."""
         if not gt_items and not parser_items:
             return True, "both_empty"
         if not gt_items:
@@ -120,33 +242,22 @@ class FieldComparator:
         if not parser_items:
             return False, "parser_empty"
 
-        def normalize_items(items):
-            normalized = []
-            for item in items:
-                if isinstance(item, dict):
-                    try:
-                        amt = float(str(item.get("amount", "")).replace("$", "").replace(",", ""))
-                    except Exception:
-                        amt = 0.0
-                    normalized.append({
-                        "code": FieldComparator.normalize_value(item.get("code", "")),
-                        "description": FieldComparator.normalize_value(item.get("description", "")),
-                        "amount": amt
-                    })
-            return normalized
-
-        gt_norm = normalize_items(gt_items)
-        pr_norm = normalize_items(parser_items)
+        if gt_norm is None:
+            gt_norm = FieldComparator.normalize_items(gt_items)
+        if pr_norm is None:
+            pr_norm = FieldComparator.normalize_items(parser_items)
 
         if len(gt_norm) == len(pr_norm):
+            # common case: same items in the same order, no Counter needed
+            if gt_norm == pr_norm:
+                return True, "exact_match"
+            # each parser item can satisfy at most one ground-truth item
+            available = Counter(pr_norm)
             matches = 0
             for g in gt_norm:
-                for p in pr_norm:
-                    if (g["description"] == p["description"] and
-                        abs(g["amount"] - p["amount"]) < 0.01 and
-                        g["code"] == p["code"]):
-                        matches += 1
-                        break
+                if available[g]:
+                    available[g] -= 1
+                    matches += 1
             if matches == len(gt_norm):
                 return True, "exact_match"
             return False, f"partial_match_{matches}/{len(gt_norm)}"
@@ -165,22 +276,26 @@ class BenchmarkRunner:
         self.config = config
         self.ground_truth = {}
         self.parser_results = {}
+        # per-doc normalized views of the evaluated fields, built once at load
+        self.ground_truth_norm = {}
+        self.parser_results_norm = {}
         self.field_metrics = {}
         self.environment_details = {}
 
     def _has_value(self, v) -> bool:
         """Robust check for value presence (handles scalars, lists, dicts, arrays)"""
-        if v is None:
-            return False
+        check = _HAS_VALUE.get(type(v))
+        return check(v) if check is not None else self._has_value_fallback(v)
+
+    @staticmethod
+    def _has_value_fallback(v) -> bool:
+        """Subclasses and non-JSON types (numpy scalars/arrays, Series, ...)."""
         if isinstance(v, (list, tuple, dict)):
             return len(v) > 0
-        if isinstance(v, (np.ndarray, pd.Series)):
+        if isinstance(v, float):
+            return v == v  # False only for NaN
+        if hasattr(v, "size"):  # np.ndarray / pd.Series
             return v.size > 0
-        try:
-            if isinstance(v, float) and np.isnan(v):
-                return False
-        except Exception:
-            pass
         return str(v).strip() != ''
 
     def _discover_test_documents(self, limit: Optional[int] = 3) -> List[str]:
@@ -189,22 +304,19 @@ class BenchmarkRunner:
         Parser files: <doc_name> + _regex.json
         GT files    : invoice_<doc_name>.json
         """
-        parser_docs = set()
-        for p in self.config.parser_dir.glob(f"*{self.config.parser_suffix}"):
-            # p.name includes extension; strip exactly the suffix '_regex.json'
-            # e.g. 'invoice_T1_gen1_regex.json' -> 'invoice_T1_gen1'
-            name = p.name[:-len(self.config.parser_suffix)]
-            if name:
-                parser_docs.add(name)
-
-        gt_docs = set()
-        for p in self.config.ground_truth_dir.glob("invoice_*.json"):
+        # scandir + plain string slicing: no Path object or fnmatch per entry
+        suffix = self.config.parser_suffix
+        with os.scandir(self.config.parser_dir) as it:
+            # strip exactly the suffix, e.g. 'invoice_T1_gen1_regex.json' -> 'invoice_T1_gen1'
+            parser_docs = {e.name[:-len(suffix)] for e in it
+                           if e.name.endswith(suffix) and len(e.name) > len(suffix)}
+
+        prefix, ext = "invoice_", ".json"
+        with os.scandir(self.config.ground_truth_dir) as it:
             # 'invoice_invoice_T1_gen1.json' -> doc = 'invoice_T1_gen1'
-            stem = p.stem
-            if stem.startswith("invoice_"):
-                doc = stem[len("invoice_"):]
-                if doc:
-                    gt_docs.add(doc)
+            gt_docs = {e.name[len(prefix):-len(ext)] for e in it
+                       if e.name.startswith(prefix) and e.name.endswith(ext)
+                       and len(e.name) > len(prefix) + len(ext)}
 
         overlap = sorted(parser_docs & gt_docs)
         if limit:
@@ -219,102 +331,144 @@ class BenchmarkRunner:
 
     # ---------------- Loaders ---------------- #
 
+    def _normalize_docs(self, docs: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Normalize every evaluated field of every document once, up front."""
+        out = {}
+        for doc, data in docs.items():
+            norm = {}
+            for field in self.config.fields_to_evaluate:
+                value = data.get(field)
+                if field == "line_items":
+                    norm[field] = FieldComparator.normalize_items(value)
+                else:
+                    norm[field] = FieldComparator.normalize_value(value)
+            out[doc] = norm
+        return out
+
     def load_ground_truth(self):
         print("Loading ground truth JSON files...")
         gt = {}
-        for doc in self.config.test_documents:
-            fname = f"invoice_{doc}.json"
-            path = self.config.ground_truth_dir / fname
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    gt[doc] = json.load(f)
-                print(f"✓ Loaded ground truth: {fname}")
-            except Exception as e:
-                print(f"✗ Could not load {path}: {e}")
+        docs = self.config.test_documents
+        paths = [self.config.ground_truth_dir / f"invoice_{doc}.json" for doc in docs]
+        for doc, path, (obj, err) in zip(docs, paths, _load_all(paths)):
+            if err is None:
+                gt[doc] = obj
+                print(f"✓ Loaded ground truth: {path.name}")
+            else:
+                print(f"✗ Could not load {path}: {err}")
         print(f"Ground truth loaded for {len(gt)} documents")
         self.ground_truth = gt
+        self.ground_truth_norm = self._normalize_docs(gt)
         return gt
 
     def load_parser_results(self):
         print("Loading parser JSON files...")
         pr = {}
-        for doc in self.config.test_documents:
-            fname = f"{doc}{self.config.parser_suffix}"
-            path = self.config.parser_dir / fname
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    pr[doc] = json.load(f)
-                print(f"✓ Loaded parser: {fname}")
-            except Exception as e:
-                print(f"✗ Could not load {path}: {e}")
+        docs = self.config.test_documents
+        paths = [self.config.parser_dir / f"{doc}{self.config.parser_suffix}" for doc in docs]
+        for doc, path, (obj, err) in zip(docs, paths, _load_all(paths)):
+            if err is None:
+                pr[doc] = obj
+                print(f"✓ Loaded parser: {path.name}")
+            else:
+                print(f"✗ Could not load {path}: {err}")
         print(f"Parser results loaded for {len(pr)} documents")
         self.parser_results = pr
+        self.parser_results_norm = self._normalize_docs(pr)
         return pr
 
     # ---------------- Metrics ---------------- #
 
-    def compute_field_metrics(self, field_name: str):
-        results = {
-            "field": field_name,
-            "total_documents": len(self.config.test_documents),
-            "gt_present": 0,
-            "parser_present": 0,
-            "both_present": 0,
-            "matches": 0,
-            "document_results": []
-        }
-
-        for doc in self.config.test_documents:
-            if doc not in self.ground_truth or doc not in self.parser_results:
-                continue
-
-            gt_value = self.ground_truth[doc].get(field_name)
-            pr_value = self.parser_results[doc].get(field_name)
-
-            gt_has_value = self._has_value(gt_value)
-            pr_has_value = self._has_value(pr_value)
-
-            if gt_has_value:
-                results["gt_present"] += 1
-            if pr_has_value:
-                results["parser_present"] += 1
-            if gt_has_value and pr_has_value:
-                results["both_present"] += 1
-
-            if field_name == "line_items":
-                is_match, mtype = FieldComparator.compare_line_items(gt_value, pr_value)
+    def _compare_scalar_column(self, field_name: str, gt_vals: pd.Series, pr_vals: pd.Series,
+                               gt_norm: pd.Series, pr_norm: pd.Series):
+        """(is_match, match_type) per document for one scalar field.
+
+        Missing and exact-equal outcomes are classified column-wise; only the
+        present-but-different pairs go through the numeric/date tolerance rules
+        in FieldComparator.compare_scalar_field.
+        """
+        gt_missing = gt_norm.isna().to_numpy()
+        pr_missing = pr_norm.isna().to_numpy()
+        exact = ~gt_missing & ~pr_missing & (gt_norm == pr_norm).to_numpy()
+        mtypes = np.select(
+            [gt_missing & pr_missing, gt_missing, pr_missing, exact],
+            ["both_missing", "gt_missing", "parser_missing", "exact_match"],
+            default="",
+        ).tolist()
+
+        outcomes = []
+        for g, p, mtype in zip(gt_vals, pr_vals, mtypes):
+            if mtype:
+                outcomes.append((mtype in ("both_missing", "exact_match"), mtype))
             else:
-                is_match, mtype = FieldComparator.compare_scalar_field(gt_value, pr_value, field_name)
-            if is_match:
-                results["matches"] += 1
-
-            results["document_results"].append({
-                "document": doc,
-                "gt_value": gt_value,
-                "parser_value": pr_value,
-                "match": is_match,
-                "match_type": mtype
-            })
-
-        prec = results["matches"] / results["parser_present"] if results["parser_present"] else 0.0
-        rec = results["matches"] / results["gt_present"] if results["gt_present"] else 0.0
+                outcomes.append(FieldComparator.compare_scalar_field(g, p, field_name))
+        return outcomes
+
+    def _valid_docs(self) -> List[str]:
+        """Test documents that loaded on both the ground-truth and parser side."""
+        return [doc for doc in self.config.test_documents
+                if doc in self.ground_truth and doc in self.parser_results]
+
+    def compute_field_metrics(self, field_name: str, valid_docs: Optional[List[str]] = None):
+        results = FieldResult(field=field_name, total_documents=len(self.config.test_documents))
+
+        docs = valid_docs if valid_docs is not None else self._valid_docs()
+        gt_vals = pd.Series([self.ground_truth[d].get(field_name) for d in docs], index=docs, dtype=object)
+        pr_vals = pd.Series([self.parser_results[d].get(field_name) for d in docs], index=docs, dtype=object)
+        gt_norm = [self.ground_truth_norm[d][field_name] for d in docs]
+        pr_norm = [self.parser_results_norm[d][field_name] for d in docs]
+
+        gt_has = gt_vals.map(self._has_value).to_numpy(dtype=bool)
+        pr_has = pr_vals.map(self._has_value).to_numpy(dtype=bool)
+        results.gt_present = int(gt_has.sum())
+        results.parser_present = int(pr_has.sum())
+        results.both_present = int((gt_has & pr_has).sum())
+
+        if field_name == "line_items":
+            outcomes = [FieldComparator.compare_line_items(g, p, gn, pn)
+                        for g, p, gn, pn in zip(gt_vals, pr_vals, gt_norm, pr_norm)]
+        else:
+            outcomes = self._compare_scalar_column(
+                field_name, gt_vals, pr_vals,
+                pd.Series(gt_norm, index=docs, dtype=object),
+                pd.Series(pr_norm, index=docs, dtype=object),
+            )
+        results.matches = sum(1 for is_match, _ in outcomes if is_match)
+
+        if self.config.keep_document_results:
+            results.document_results = [
+                {
+                    "document": doc,
+                    "gt_value": gt_value,
+                    "parser_value": pr_value,
+                    "match": is_match,
+                    "match_type": mtype
+                }
+                for doc, gt_value, pr_value, (is_match, mtype) in zip(docs, gt_vals, pr_vals, outcomes)
+            ]
+
+        prec = results.matches / results.parser_present if results.parser_present else 0.0
+        rec = results.matches / results.gt_present if results.gt_present else 0.0
         f1 = 2 * (prec * rec) / (prec + rec) if (prec + rec) else 0.0
 
-        results.update({"precision": prec, "recall": rec, "f1_score": f1})
+        results.precision, results.recall, results.f1_score = prec, rec, f1
         return results
 
     def compute_all_field_metrics(self):
         print("Computing metrics for all fields...")
         metrics = {}
+        valid_docs = self._valid_docs()  # same for every field
         for f in self.config.fields_to_evaluate:
             print(f"Computing metrics for field: {f}")
-            metrics[f] = self.compute_field_metrics(f)
+            metrics[f] = self.compute_field_metrics(f, valid_docs)
         self.field_metrics = metrics
         return metrics
 
     def compute_overall_accuracy(self):
-        total = sum(m["total_documents"] for m in self.field_metrics.values())
-        matches = sum(m["matches"] for m in self.field_metrics.values())
+        total = matches = 0
+        for m in self.field_metrics.values():
+            total += m.total_documents
+            matches += m.matches
         return matches / total if total else 0.0
 
     # ---------------- Run ---------------- #
@@ -346,13 +500,23 @@ class BenchmarkRunner:
         out_json = out_dir / f"benchmark_{self.config.version}.json"
         out_csv = out_dir / f"benchmark_{self.config.version}.csv"
 
-        df = pd.DataFrame([
-            {"Field": f, "Precision": m["precision"], "Recall": m["recall"], "F1": m["f1_score"]}
-            for f, m in self.field_metrics.items()
-        ])
+        # columns and dtypes are known: build them directly, no per-row dicts
+        metrics = list(self.field_metrics.values())
+        n = len(metrics)
+        df = pd.DataFrame({
+            "Field": list(self.field_metrics),
+            "Precision": np.fromiter((m.precision for m in metrics), dtype=np.float64, count=n),
+            "Recall": np.fromiter((m.recall for m in metrics), dtype=np.float64, count=n),
+            "F1": np.fromiter((m.f1_score for m in metrics), dtype=np.float64, count=n),
+        })
         df.to_csv(out_csv, index=False)
-        with open(out_json, "w", encoding="utf-8") as f:
-            json.dump({"metrics": self.field_metrics, "overall_accuracy": acc}, f, indent=2)
+        metrics_json = {name: asdict(m) for name, m in self.field_metrics.items()}
+        payload = {"metrics": metrics_json, "overall_accuracy": acc}
+        if orjson is not None:
+            out_json.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(out_json, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
 
         print(f"Results saved to: {out_json} and {out_csv}")
         return self.field_metrics
@@ -10,6 +10,7 @@ and aggregated metrics for validation (Jay’s notebook compatible).
 """
 
 import pandas as pd
+import csv
 import json
 import numpy as np
 import sys
@@ -23,6 +24,15 @@ import random
 import uuid
 import subprocess
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # stdlib json still works, just slower
+    orjson = None
 
 warnings.filterwarnings("ignore")
 
@@ -32,6 +42,26 @@ np.random.seed(RANDOM_SEED)
 
 HERE = Path(__file__).resolve().parent
 
+_NONDIGIT_RE = re.compile(r"\D")
+_NONALNUM_RE = re.compile(r"[^a-z0-9]")
+_DATE_FMTS = ("%Y-%m-%d", "%Y/%m/%d", "%m-%d-%Y", "%m/%d/%Y")
+# str.translate tables for the ASCII case; non-ASCII input falls back to the regexes
+_DROP_NON_DIGIT = dict.fromkeys(i for i in range(128) if not chr(i).isdigit())
+_DROP_NON_ALNUM = dict.fromkeys(i for i in range(128) if not chr(i).isalnum())
+_NUMERIC_FIELDS = frozenset({"subtotal_amount", "total_amount", "discount_amount", "patient_age"})
+_DATE_FIELDS = frozenset({"invoice_date", "due_date", "admission_date", "discharge_date"})
+
+_BY_FIELD_COLUMNS = (
+    "run_id", "schema_version", "git",
+    "field", "precision", "recall", "f1",
+    "gt_present", "parser_present", "matches", "total_documents",
+)
+_BY_DOCUMENT_COLUMNS = (
+    "run_id", "schema_version", "git",
+    "document", "field", "match", "match_type",
+    "gt_value", "parser_value", "gt_present", "parser_present",
+)
+
 
 # ------------------------------------------------------------------------------
 # Utility: git commit short hash
@@ -48,6 +78,29 @@ def _git_commit_short(root: Path) -> str:
         return "nogit"
 
 
+def _load_and_hash(path: Path):
+    """Parse a JSON file and SHA-256 it from a single read of its bytes."""
+    raw = path.read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    return data, hashlib.sha256(raw).hexdigest()
+
+
+def _load_one(path: Path):
+    """(parsed, digest, None) on success, (None, None, exc) on failure; thread-safe."""
+    try:
+        return (*_load_and_hash(path), None)
+    except Exception as e:
+        return None, None, e
+
+
+def _load_all(paths: List[Path]):
+    """Read and hash many small JSON files concurrently, preserving input order."""
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as ex:
+        return list(ex.map(_load_one, paths))
+
+
 # ------------------------------------------------------------------------------
 # Config
 # ------------------------------------------------------------------------------
@@ -98,27 +151,37 @@ class BenchmarkConfig:
 # ------------------------------------------------------------------------------
 
 class _CSVShimAuditLogger:
-    """Fallback logger that appends CSV rows to outputs/audit_log.csv"""
+    """Fallback logger that appends CSV rows to outputs/audit_log.csv.
+
+    Rows are buffered in memory; call flush() to write them out in one go.
+    """
+    keys = [
+        "timestamp", "run_id", "schema_version", "git", "stage",
+        "field", "document", "precision", "recall", "f1",
+        "gt_present", "parser_present", "matches", "total_documents",
+        "match", "match_type"
+    ]
+
     def __init__(self, out_dir: Path):
         self.path = out_dir / "audit_log.csv"
         self._header_written = self.path.exists()
+        self._buffer: List[dict] = []
 
     def log(self, row: dict):
+        self._buffer.append(row)
+
+    def flush(self):
+        if not self._buffer:
+            return
         import csv
-        keys = [
-            "timestamp", "run_id", "schema_version", "git", "stage",
-            "field", "document", "precision", "recall", "f1",
-            "gt_present", "parser_present", "matches", "total_documents",
-            "match", "match_type"
-        ]
         self.path.parent.mkdir(parents=True, exist_ok=True)
         with open(self.path, "a", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=keys)
+            w = csv.DictWriter(f, fieldnames=self.keys, restval="", extrasaction="ignore")
             if not self._header_written:
                 w.writeheader()
                 self._header_written = True
-            row_out = {k: row.get(k, "") for k in keys}
-            w.writerow(row_out)
+            w.writerows(self._buffer)
+        self._buffer.clear()
 
 
 def get_audit_logger(out_dir: Path):
@@ -130,7 +193,7 @@ def get_audit_logger(out_dir: Path):
     """
     try:
         from audit_logger import AuditLogger  # noqa
-        logger = AuditLogger(out_dir)
+        logger = AuditLogger(Path(out_dir) / "audit_log.jsonl")
 
         # Case 1: .log(record) exists
         if hasattr(logger, "log") and callable(getattr(logger, "log")):
@@ -165,12 +228,93 @@ def get_audit_logger(out_dir: Path):
 # Field comparator
 # ------------------------------------------------------------------------------
 
+class MatchType(IntEnum):
+    """Integer category of a comparator match_type label (used for diagnostics)."""
+    EXACT = 0
+    BOTH_MISSING = 1
+    GT_MISSING = 2
+    PARSER_MISSING = 3
+    NUMERIC = 4
+    DATE = 5
+    PHONE = 6
+    ADDRESS = 7
+    PARTIAL = 8
+    LENGTH_MISMATCH = 9
+    MISMATCH = 10
+    BOTH_EMPTY = 11
+    GT_EMPTY = 12
+    PARSER_EMPTY = 13
+
+
+_MATCH_TYPE_CODES = {
+    "exact_match": MatchType.EXACT,
+    "exact_match_by_code_amount": MatchType.EXACT,
+    "both_missing": MatchType.BOTH_MISSING,
+    "gt_missing": MatchType.GT_MISSING,
+    "parser_missing": MatchType.PARSER_MISSING,
+    "numeric_match": MatchType.NUMERIC,
+    "date_match": MatchType.DATE,
+    "phone_match": MatchType.PHONE,
+    "address_match": MatchType.ADDRESS,
+    "mismatch": MatchType.MISMATCH,
+    "both_empty": MatchType.BOTH_EMPTY,
+    "gt_empty": MatchType.GT_EMPTY,
+    "parser_empty": MatchType.PARSER_EMPTY,
+}
+
+
+def match_type_code(label: str) -> MatchType:
+    code = _MATCH_TYPE_CODES.get(label)
+    if code is not None:
+        return code
+    if label.startswith("partial_match"):
+        return MatchType.PARTIAL
+    if label.startswith("length_mismatch"):
+        return MatchType.LENGTH_MISMATCH
+    return MatchType.MISMATCH
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_str(s: str) -> str:
+    """YYYYMMDD for a stripped, non-empty date string (strptime is slow; cache it)."""
+    for fmt in _DATE_FMTS:
+        try:
+            dt = datetime.strptime(s, fmt)
+            return dt.strftime("%Y%m%d")
+        except Exception:
+            pass
+    digits = _NONDIGIT_RE.sub("", s)
+    return digits if len(digits) == 8 else s
+
+
+def normalize_phone(p) -> str:
+    if p is None:
+        return ""
+    p = str(p)
+    # keep digits only
+    digits = p.translate(_DROP_NON_DIGIT) if p.isascii() else _NONDIGIT_RE.sub("", p)
+    # Strip leading US country code '1' if present (11 -> 10)
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits
+
+
+def normalize_address(s) -> str:
+    if not s:
+        return ""
+    s = str(s).lower()
+    # remove everything except a-z and digits
+    return s.translate(_DROP_NON_ALNUM) if s.isascii() else _NONALNUM_RE.sub("", s)
+
+
 class FieldComparator:
     """Compare and normalize field values."""
 
     @staticmethod
     def normalize_value(value):
-        if pd.isna(value) or value is None:
+        if value is None:
+            return None
+        if isinstance(value, float) and value != value:  # NaN
             return None
         if isinstance(value, str):
             return value.strip().lower()
@@ -183,18 +327,14 @@ class FieldComparator:
         s = str(s).strip()
         if not s:
             return None
-        fmts = ["%Y-%m-%d", "%Y/%m/%d", "%m-%d-%Y", "%m/%d/%Y"]
-        for fmt in fmts:
-            try:
-                dt = datetime.strptime(s, fmt)
-                return dt.strftime("%Y%m%d")
-            except Exception:
-                pass
-        digits = re.sub(r"\D", "", s)
-        return digits if len(digits) == 8 else s
+        return _parse_date_str(s)
 
     @staticmethod
     def compare_scalar_field(gt_value, parser_value, field_name):
+        # Identical raw strings need no normalization (covers `is` as well)
+        if isinstance(gt_value, str) and gt_value == parser_value:
+            return True, "exact_match"
+
         gt_norm = FieldComparator.normalize_value(gt_value)
         parser_norm = FieldComparator.normalize_value(parser_value)
 
@@ -208,8 +348,7 @@ class FieldComparator:
         if gt_norm == parser_norm:
             return True, "exact_match"
 
-        numeric_fields = ['subtotal_amount', 'total_amount', 'discount_amount', 'patient_age']
-        if field_name in numeric_fields:
+        if field_name in _NUMERIC_FIELDS:
             try:
                 gt_num = float(str(gt_value).replace('$', '').replace(',', ''))
                 parser_num = float(str(parser_value).replace('$', '').replace(',', ''))
@@ -218,8 +357,7 @@ class FieldComparator:
             except Exception:
                 pass
 
-        date_fields = ['invoice_date', 'due_date', 'admission_date', 'discharge_date']
-        if field_name in date_fields:
+        if field_name in _DATE_FIELDS:
             gt_date = FieldComparator._normalize_date_like(gt_value)
             pr_date = FieldComparator._normalize_date_like(parser_value)
             if gt_date is None and pr_date is None:
@@ -233,16 +371,6 @@ class FieldComparator:
             
         # Handle phone numbers more flexibly (normalize to 10 digits)
         if "phone" in field_name:
-            def normalize_phone(p):
-                if p is None:
-                    return ""
-                p = str(p)
-                digits = re.sub(r"\D", "", p)  # keep digits only
-                # Strip leading US country code '1' if present (11 -> 10)
-                if len(digits) == 11 and digits.startswith("1"):
-                    digits = digits[1:]
-                return digits
-
             gt_phone = normalize_phone(gt_value)
             pr_phone = normalize_phone(parser_value)
             if gt_phone and pr_phone and gt_phone == pr_phone:
@@ -250,14 +378,6 @@ class FieldComparator:
             
         # Handle addresses: ignore case, whitespace, punctuation
         if "address" in field_name:
-            def normalize_address(s):
-                if not s:
-                    return ""
-                s = str(s).lower()
-                # remove everything except a-z and digits
-                s = re.sub(r"[^a-z0-9]", "", s)
-                return s
-
             gt_addr = normalize_address(gt_value)
             pr_addr = normalize_address(parser_value)
             if gt_addr and pr_addr and gt_addr == pr_addr:
@@ -293,11 +413,18 @@ class FieldComparator:
         gt_norm = normalize_items(gt_items)
         pr_norm = normalize_items(parser_items)
 
-        # Match by (code, amount)
-        from collections import Counter
-        gt_keys = [(g["code"], g["amount"]) for g in gt_norm]
-        pr_keys = [(p["code"], p["amount"]) for p in pr_norm]
-        hard = sum((Counter(gt_keys) & Counter(pr_keys)).values())
+        # Match by (code, amount): multiset intersection over one dict
+        counts = {}
+        for g in gt_norm:
+            k = (g["code"], g["amount"])
+            counts[k] = counts.get(k, 0) + 1
+        hard = 0
+        for p in pr_norm:
+            k = (p["code"], p["amount"])
+            c = counts.get(k, 0)
+            if c > 0:
+                hard += 1
+                counts[k] = c - 1
 
         if hard == len(gt_norm) == len(pr_norm):
             return True, "exact_match_by_code_amount"
@@ -321,6 +448,16 @@ class BenchmarkRunner:
         self.parser_results = {}
         self.field_metrics = {}
         self.environment_details = {}
+        self._diagnostics = self._empty_diagnostics()
+        # Document-indexed frames (one column per field) built at load time
+        self.gt_df = pd.DataFrame()
+        self.pr_df = pd.DataFrame()
+        # Normalized views of those frames, computed once after loading
+        self._gt_norm: Dict[str, Dict[str, Any]] = {"value": {}, "date": {}, "amount": {}}
+        self._pr_norm: Dict[str, Dict[str, Any]] = {"value": {}, "date": {}, "amount": {}}
+        # SHA-256 of each file, captured while loading
+        self._gt_hashes: Dict[str, str] = {}
+        self._pr_hashes: Dict[str, str] = {}
 
         # Run/session identity
         self.run_id = f"run-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
@@ -371,33 +508,35 @@ class BenchmarkRunner:
     def load_ground_truth(self):
         print("Loading ground truth JSON files...")
         gt = {}
-        for doc in self.config.test_documents:
-            fname = f"invoice_{doc}.json"
-            path = self.config.ground_truth_dir / fname
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    gt[doc] = json.load(f)
-                print(f"✓ Loaded ground truth: {fname}")
-            except Exception as e:
-                print(f"✗ Could not load {path}: {e}")
+        docs = self.config.test_documents
+        paths = [self.config.ground_truth_dir / f"invoice_{doc}.json" for doc in docs]
+        for doc, path, (obj, digest, err) in zip(docs, paths, _load_all(paths)):
+            if err is None:
+                gt[doc], self._gt_hashes[doc] = obj, digest
+                print(f"✓ Loaded ground truth: {path.name}")
+            else:
+                print(f"✗ Could not load {path}: {err}")
         print(f"Ground truth loaded for {len(gt)} documents")
         self.ground_truth = gt
+        self.gt_df = self._docs_frame(gt)
+        self._gt_norm = self._normalize_frame(self.gt_df)
         return gt
 
     def load_parser_results(self):
         print("Loading parser JSON files...")
         pr = {}
-        for doc in self.config.test_documents:
-            fname = f"invoice_{doc}{self.config.parser_suffix}"
-            path = self.config.parser_dir / fname
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    pr[doc] = json.load(f)
-                print(f"✓ Loaded parser: {fname}")
-            except Exception as e:
-                print(f"✗ Could not load {path}: {e}")
+        docs = self.config.test_documents
+        paths = [self.config.parser_dir / f"invoice_{doc}{self.config.parser_suffix}" for doc in docs]
+        for doc, path, (obj, digest, err) in zip(docs, paths, _load_all(paths)):
+            if err is None:
+                pr[doc], self._pr_hashes[doc] = obj, digest
+                print(f"✓ Loaded parser: {path.name}")
+            else:
+                print(f"✗ Could not load {path}: {err}")
         print(f"Parser results loaded for {len(pr)} documents")
         self.parser_results = pr
+        self.pr_df = self._docs_frame(pr)
+        self._pr_norm = self._normalize_frame(self.pr_df)
         return pr
 
     # ---------------- Environment ---------------- #
@@ -418,11 +557,19 @@ class BenchmarkRunner:
             "data_hashes": {}
         }
 
-        for doc in self.config.test_documents:
-            gt_path = self.config.ground_truth_dir / f"invoice_{doc}.json"
-            pr_path = self.config.parser_dir / f"invoice_{doc}{self.config.parser_suffix}"
-            details["data_hashes"][f"gt:{doc}"] = self._file_hash(gt_path)
-            details["data_hashes"][f"parser:{doc}"] = self._file_hash(pr_path)
+        # Files that loaded were hashed on the way in; only re-open the rest
+        cfg = self.config
+        gt_hashes, pr_hashes = self._gt_hashes, self._pr_hashes
+        data_hashes = details["data_hashes"]
+        for doc in cfg.test_documents:
+            gt_hash = gt_hashes.get(doc)
+            if gt_hash is None:
+                gt_hash = self._file_hash(cfg.ground_truth_dir / f"invoice_{doc}.json")
+            pr_hash = pr_hashes.get(doc)
+            if pr_hash is None:
+                pr_hash = self._file_hash(cfg.parser_dir / f"invoice_{doc}{cfg.parser_suffix}")
+            data_hashes[f"gt:{doc}"] = gt_hash
+            data_hashes[f"parser:{doc}"] = pr_hash
 
         self.environment_details = details
         return details
@@ -430,7 +577,12 @@ class BenchmarkRunner:
     def _file_hash(self, path: Path) -> str:
         try:
             with open(path, "rb") as f:
-                return hashlib.sha256(f.read()).hexdigest()
+                if sys.version_info >= (3, 11):
+                    return hashlib.file_digest(f, "sha256").hexdigest()
+                h = hashlib.sha256()
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+                return h.hexdigest()
         except FileNotFoundError:
             return "file_not_found"
 
@@ -440,59 +592,183 @@ class BenchmarkRunner:
         """Report required-field presence for GT and Parser per document."""
         required = set(self.config.fields_to_evaluate)
         report = {"by_document": {}, "missing_in_gt_counts": {}, "missing_in_parser_counts": {}}
+        miss_gt_counter, miss_pr_counter = Counter(), Counter()
+        has_value = self._has_value
 
         for doc in self.config.test_documents:
             gt = self.ground_truth.get(doc, {})
             pr = self.parser_results.get(doc, {})
-            miss_gt, miss_pr = [], []
-            for f in required:
-                if not self._has_value(gt.get(f)):
-                    miss_gt.append(f)
-                    report["missing_in_gt_counts"][f] = report["missing_in_gt_counts"].get(f, 0) + 1
-                if not self._has_value(pr.get(f)):
-                    miss_pr.append(f)
-                    report["missing_in_parser_counts"][f] = report["missing_in_parser_counts"].get(f, 0) + 1
+            miss_gt = required - {f for f in required & gt.keys() if has_value(gt[f])}
+            miss_pr = required - {f for f in required & pr.keys() if has_value(pr[f])}
+            miss_gt_counter.update(miss_gt)
+            miss_pr_counter.update(miss_pr)
             report["by_document"][doc] = {
                 "missing_in_gt": sorted(miss_gt),
                 "missing_in_parser": sorted(miss_pr),
             }
+        report["missing_in_gt_counts"] = dict(miss_gt_counter)
+        report["missing_in_parser_counts"] = dict(miss_pr_counter)
         return report
 
-    def build_diagnostics(self) -> Dict[str, Any]:
-        """Summarize missing fields, partial matches, date matches, and numeric discrepancies."""
-        numeric_fields = {"subtotal_amount", "total_amount", "discount_amount", "patient_age"}
-        diags = {
+    @staticmethod
+    def _empty_diagnostics() -> Dict[str, Any]:
+        return {
             "missing_fields_per_parser": {},   # field -> count of parser_missing
             "partial_matches": [],             # list of {field, document, match_type}
             "date_format_matches": [],         # where match_type == date_match
             "numeric_discrepancies": []        # numeric fields present on both but mismatch
         }
 
-        for field, m in self.field_metrics.items():
-            for r in m["document_results"]:
-                mt = r["match_type"]
-                doc = r["document"]
-                gt_has = self._has_value(r["gt_value"])
-                pr_has = self._has_value(r["parser_value"])
+    def _index_diagnostics(self, field_name: str, docs: List[str], gt_vals: pd.Series,
+                           pr_vals: pd.Series, mtypes: List[str], mismatched: np.ndarray):
+        """File one field's outcomes into the diagnostic buckets as they are computed."""
+        diags = self._diagnostics
+        codes = np.fromiter(map(match_type_code, mtypes), dtype=np.int8, count=len(mtypes))
+
+        n_missing = int((codes == MatchType.PARSER_MISSING).sum())
+        if n_missing:
+            diags["missing_fields_per_parser"][field_name] = n_missing
+
+        partial = (codes == MatchType.PARTIAL) | (codes == MatchType.LENGTH_MISMATCH)
+        for i in np.flatnonzero(partial):
+            diags["partial_matches"].append(
+                {"field": field_name, "document": docs[i], "match_type": mtypes[i]})
+
+        for i in np.flatnonzero(codes == MatchType.DATE):
+            diags["date_format_matches"].append({"field": field_name, "document": docs[i]})
+
+        if field_name in _NUMERIC_FIELDS:
+            for i in np.flatnonzero(mismatched):
+                diags["numeric_discrepancies"].append({
+                    "field": field_name, "document": docs[i],
+                    "gt_value": gt_vals.iat[i], "parser_value": pr_vals.iat[i]
+                })
 
-                if mt == "parser_missing":
-                    diags["missing_fields_per_parser"][field] = diags["missing_fields_per_parser"].get(field, 0) + 1
+    def build_diagnostics(self) -> Dict[str, Any]:
+        """Summarize missing fields, partial matches, date matches, and numeric discrepancies.
 
-                if isinstance(mt, str) and (mt.startswith("partial_match") or mt.startswith("length_mismatch")):
-                    diags["partial_matches"].append({"field": field, "document": doc, "match_type": mt})
+        The buckets are filled by compute_field_metrics, so this is a read.
+        """
+        return self._diagnostics
 
-                if mt == "date_match":
-                    diags["date_format_matches"].append({"field": field, "document": doc})
+    # ---------------- Metrics ---------------- #
 
-                if field in numeric_fields and gt_has and pr_has and not r["match"]:
-                    diags["numeric_discrepancies"].append({
-                        "field": field, "document": doc,
-                        "gt_value": r["gt_value"], "parser_value": r["parser_value"]
-                    })
+    @staticmethod
+    def _docs_frame(records: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+        """One row per loaded document, one object column per field.
+
+        Columns are built from per-field object Series so pandas never
+        infers a numeric dtype (483 must stay 483, not 483.0), absent keys
+        are None rather than NaN, and documents with an empty dict still
+        get a row.
+        """
+        index = list(records)
+        fields = dict.fromkeys(f for rec in records.values() for f in rec)
+        return pd.DataFrame(
+            {
+                f: pd.Series([rec.get(f) for rec in records.values()], index=index, dtype=object)
+                for f in fields
+            },
+            index=index,
+        )
 
-        return diags
+    @staticmethod
+    def _field_column(df: pd.DataFrame, field_name: str, docs: List[str]) -> pd.Series:
+        """Values of one field for `docs`, with absent keys as None (not NaN)."""
+        if field_name not in df.columns:
+            return pd.Series([None] * len(docs), index=docs, dtype=object)
+        return df[field_name].reindex(docs)
 
-    # ---------------- Metrics ---------------- #
+    @staticmethod
+    def _to_amount(values: pd.Series) -> np.ndarray:
+        cleaned = values.astype(str).str.replace(r"[$,]", "", regex=True).str.strip()
+        return pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype=float)
+
+    def _normalize_frame(self, df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """Normalize every scalar column of a loaded frame once per run.
+
+        "value" holds normalize_value() output for every field, "date" the
+        YYYYMMDD form for date fields and "amount" parsed floats for numeric
+        fields, each as a document-indexed Series.
+        """
+        norm = {"value": {}, "date": {}, "amount": {}}
+        for field_name in df.columns:
+            if field_name == "line_items":
+                continue
+            col = df[field_name]
+            norm["value"][field_name] = col.map(FieldComparator.normalize_value)
+            if field_name in _DATE_FIELDS:
+                norm["date"][field_name] = col.map(FieldComparator._normalize_date_like)
+            if field_name in _NUMERIC_FIELDS:
+                norm["amount"][field_name] = pd.Series(self._to_amount(col), index=col.index)
+        return norm
+
+    @staticmethod
+    def _normalized(norm: Dict[str, Dict[str, Any]], kind: str, field_name: str,
+                    docs: List[str]) -> pd.Series:
+        col = norm[kind].get(field_name)
+        if col is None:
+            if kind == "amount":
+                return pd.Series(np.nan, index=docs, dtype=float)
+            return pd.Series([None] * len(docs), index=docs, dtype=object)
+        return col.reindex(docs)
+
+    def _compare_scalar_column(self, field_name: str, gt_vals: pd.Series, pr_vals: pd.Series):
+        """(match mask, match types) for one scalar field across all documents.
+
+        Every rule of FieldComparator.compare_scalar_field is applied
+        column-wise on the pre-normalized frames; only pairs the vectorized
+        rules cannot classify (values that fail to parse as amounts or dates)
+        fall back to the scalar path.
+        """
+        docs = gt_vals.index
+        gt_norm = self._normalized(self._gt_norm, "value", field_name, docs)
+        pr_norm = self._normalized(self._pr_norm, "value", field_name, docs)
+        gt_missing = gt_norm.isna().to_numpy()
+        pr_missing = pr_norm.isna().to_numpy()
+        both = ~gt_missing & ~pr_missing
+        exact = both & (gt_norm == pr_norm).to_numpy()
+
+        conds = [gt_missing & pr_missing, gt_missing, pr_missing, exact]
+        labels = ["both_missing", "gt_missing", "parser_missing", "exact_match"]
+        if field_name in _NUMERIC_FIELDS:
+            gt_num = self._normalized(self._gt_norm, "amount", field_name, docs).to_numpy(dtype=float)
+            pr_num = self._normalized(self._pr_norm, "amount", field_name, docs).to_numpy(dtype=float)
+            parsed = ~np.isnan(gt_num) & ~np.isnan(pr_num)
+            close = np.zeros(len(gt_num), dtype=bool)
+            np.less(np.abs(gt_num - pr_num), 0.01, out=close, where=parsed)
+            conds += [both & close, both & parsed]
+            labels += ["numeric_match", "mismatch"]
+        elif field_name in _DATE_FIELDS:
+            gt_date = self._normalized(self._gt_norm, "date", field_name, docs)
+            pr_date = self._normalized(self._pr_norm, "date", field_name, docs)
+            dated = both & gt_date.notna().to_numpy() & pr_date.notna().to_numpy()
+            conds += [dated & (gt_date == pr_date).to_numpy(), dated]
+            labels += ["date_match", "mismatch"]
+        elif "phone" in field_name and "address" not in field_name:
+            gt_phone = gt_vals.map(normalize_phone)
+            pr_phone = pr_vals.map(normalize_phone)
+            dialed = ((gt_phone != "") & (pr_phone != "") & (gt_phone == pr_phone)).to_numpy()
+            conds += [both & dialed, both]
+            labels += ["phone_match", "mismatch"]
+        elif "address" in field_name and "phone" not in field_name:
+            gt_addr = gt_vals.map(normalize_address)
+            pr_addr = pr_vals.map(normalize_address)
+            same = ((gt_addr != "") & (pr_addr != "") & (gt_addr == pr_addr)).to_numpy()
+            conds += [both & same, both]
+            labels += ["address_match", "mismatch"]
+        elif "phone" not in field_name:
+            conds.append(both)
+            labels.append("mismatch")
+
+        mtypes = np.select(conds, labels, default="").tolist()
+        matched = np.isin(mtypes, ("both_missing", "exact_match", "numeric_match",
+                                   "date_match", "phone_match", "address_match"))
+
+        for i in np.flatnonzero(np.array(mtypes) == ""):
+            matched[i], mtypes[i] = FieldComparator.compare_scalar_field(
+                gt_vals.iat[i], pr_vals.iat[i], field_name)
+        return matched, mtypes
 
     def compute_field_metrics(self, field_name: str):
         results = {
@@ -505,41 +781,40 @@ class BenchmarkRunner:
             "document_results": []
         }
 
-        for doc in self.config.test_documents:
-            if doc not in self.ground_truth or doc not in self.parser_results:
-                continue
-
-            gt_value = self.ground_truth[doc].get(field_name)
-            pr_value = self.parser_results[doc].get(field_name)
-
-            gt_has = self._has_value(gt_value)
-            pr_has = self._has_value(pr_value)
+        gt_all, pr_all = self.ground_truth, self.parser_results
+        docs = [doc for doc in self.config.test_documents if doc in gt_all and doc in pr_all]
+        gt_vals = self._field_column(self.gt_df, field_name, docs)
+        pr_vals = self._field_column(self.pr_df, field_name, docs)
 
-            if gt_has:
-                results["gt_present"] += 1
-            if pr_has:
-                results["parser_present"] += 1
-            if gt_has and pr_has:
-                results["both_present"] += 1
+        gt_has = gt_vals.map(self._has_value).to_numpy(dtype=bool)
+        pr_has = pr_vals.map(self._has_value).to_numpy(dtype=bool)
 
-            if field_name == "line_items":
-                is_match, mtype = FieldComparator.compare_line_items(gt_value, pr_value)
-            else:
-                is_match, mtype = FieldComparator.compare_scalar_field(gt_value, pr_value, field_name)
-
-            #if is_match:
-               # results["matches"] += 1
-            # AFTER: only count when both present
-            if is_match and gt_has and pr_has:
-                results["matches"] += 1
-
-            results["document_results"].append({
+        if field_name == "line_items":
+            outcomes = [FieldComparator.compare_line_items(g, p) for g, p in zip(gt_vals, pr_vals)]
+            matched = np.fromiter((m for m, _ in outcomes), dtype=bool, count=len(outcomes))
+            mtypes = [t for _, t in outcomes]
+        else:
+            matched, mtypes = self._compare_scalar_column(field_name, gt_vals, pr_vals)
+
+        results["gt_present"] = int(gt_has.sum())
+        results["parser_present"] = int(pr_has.sum())
+        results["both_present"] = int((gt_has & pr_has).sum())
+        # only count matches when both sides are present
+        results["matches"] = int((matched & gt_has & pr_has).sum())
+        self._index_diagnostics(field_name, docs, gt_vals, pr_vals, mtypes,
+                                gt_has & pr_has & ~matched)
+
+        results["document_results"] = [
+            {
                 "document": doc,
                 "gt_value": gt_value,
                 "parser_value": pr_value,
-                "match": is_match,
+                "match": bool(is_match),
                 "match_type": mtype
-            })
+            }
+            for doc, gt_value, pr_value, is_match, mtype
+            in zip(docs, gt_vals, pr_vals, matched, mtypes)
+        ]
 
         # Avoid penalizing fields missing on both sides
         if results["gt_present"] == 0 and results["parser_present"] == 0:
@@ -554,20 +829,20 @@ class BenchmarkRunner:
 
     def compute_all_field_metrics(self):
         print("Computing metrics for all fields...")
+        self._diagnostics = self._empty_diagnostics()
 
         # Union of keys seen in any GT or parser document
         union_fields = set()
+        gt_all, pr_all = self.ground_truth, self.parser_results
         for doc in self.config.test_documents:
-            union_fields.update(self.ground_truth.get(doc, {}).keys())
-            union_fields.update(self.parser_results.get(doc, {}).keys())
+            union_fields.update(gt_all.get(doc, {}).keys())
+            union_fields.update(pr_all.get(doc, {}).keys())
 
         # Ensure our “required” list is included
         union_fields.update(self.config.fields_to_evaluate)
 
         # Put line_items last for nicer output
-        ordered = sorted(f for f in union_fields if f != "line_items")
-        if "line_items" in union_fields:
-            ordered.append("line_items")
+        ordered = sorted(union_fields - {"line_items"}) + (["line_items"] if "line_items" in union_fields else [])
 
         metrics = {}
         for f in ordered:
@@ -607,21 +882,23 @@ class BenchmarkRunner:
 
     def _log_per_document_metrics(self):
         ts = datetime.now().isoformat()
+        log, has_value = self.logger.log, self._has_value
+        run_id, schema_version, git_short = self.run_id, self.schema_version, self.git_short
         for field, m in self.field_metrics.items():
             for r in m["document_results"]:
-                self.logger.log({
+                log({
                     "timestamp": ts,
-                    "run_id": self.run_id,
-                    "schema_version": self.schema_version,
-                    "git": self.git_short,
+                    "run_id": run_id,
+                    "schema_version": schema_version,
+                    "git": git_short,
                     "stage": "metrics_by_document",
                     "field": field,
                     "document": r["document"],
                     "precision": "",
                     "recall": "",
                     "f1": "",
-                    "gt_present": int(self._has_value(r["gt_value"])),
-                    "parser_present": int(self._has_value(r["parser_value"])),
+                    "gt_present": int(has_value(r["gt_value"])),
+                    "parser_present": int(has_value(r["parser_value"])),
                     "matches": "",
                     "total_documents": "",
                     "match": r["match"],
@@ -629,54 +906,34 @@ class BenchmarkRunner:
                 })
 
     def export_metrics_by_field(self) -> Path:
-        rows = []
-        for field, m in self.field_metrics.items():
-            rows.append({
-                "run_id": self.run_id,
-                "schema_version": self.schema_version,
-                "git": self.git_short,
-                "field": field,
-                "precision": m["precision"],
-                "recall": m["recall"],
-                "f1": m["f1_score"],
-                "gt_present": m["gt_present"],
-                "parser_present": m["parser_present"],
-                "matches": m["matches"],
-                "total_documents": m["total_documents"],
-            })
-        df = pd.DataFrame(rows, columns=[
-            "run_id","schema_version","git",
-            "field","precision","recall","f1",
-            "gt_present","parser_present","matches","total_documents"
-        ])
         out = Path(self.config.output_dir) / "metrics_by_field.csv"
-        df.to_csv(out, index=False)
+        with open(out, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f, lineterminator="\n")
+            w.writerow(_BY_FIELD_COLUMNS)
+            for field, m in self.field_metrics.items():
+                w.writerow((
+                    self.run_id, self.schema_version, self.git_short,
+                    field, m["precision"], m["recall"], m["f1_score"],
+                    m["gt_present"], m["parser_present"], m["matches"], m["total_documents"],
+                ))
         return out
 
     def export_metrics_by_document(self) -> Path:
-        rows = []
-        for field, m in self.field_metrics.items():
-            for r in m["document_results"]:
-                rows.append({
-                    "run_id": self.run_id,
-                    "schema_version": self.schema_version,
-                    "git": self.git_short,
-                    "document": r["document"],
-                    "field": field,
-                    "match": r["match"],
-                    "match_type": r["match_type"],
-                    "gt_value": r["gt_value"],
-                    "parser_value": r["parser_value"],
-                    "gt_present": int(self._has_value(r["gt_value"])),
-                    "parser_present": int(self._has_value(r["parser_value"])),
-                })
-        df = pd.DataFrame(rows, columns=[
-            "run_id","schema_version","git",
-            "document","field","match","match_type",
-            "gt_value","parser_value","gt_present","parser_present"
-        ])
         out = Path(self.config.output_dir) / "metrics_by_document.csv"
-        df.to_csv(out, index=False)
+        with open(out, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f, lineterminator="\n")
+            w.writerow(_BY_DOCUMENT_COLUMNS)
+            writerow, has_value = w.writerow, self._has_value
+            run_id, schema_version, git_short = self.run_id, self.schema_version, self.git_short
+            for field, m in self.field_metrics.items():
+                for r in m["document_results"]:
+                    writerow((
+                        run_id, schema_version, git_short,
+                        r["document"], field, r["match"], r["match_type"],
+                        r["gt_value"], r["parser_value"],
+                        int(has_value(r["gt_value"])),
+                        int(has_value(r["parser_value"])),
+                    ))
         return out
 
     # ---------------- Run ---------------- #
@@ -712,6 +969,9 @@ class BenchmarkRunner:
         # Logging & Aggregates for validation
         self._log_per_field_metrics()
         self._log_per_document_metrics()
+        flush = getattr(self.logger, "flush", None)
+        if callable(flush):
+            flush()
         by_field_csv = self.export_metrics_by_field()
         by_doc_csv = self.export_metrics_by_document()
 
@@ -724,22 +984,23 @@ class BenchmarkRunner:
         out_json = out_dir / f"benchmark_{self.config.version}.json"
         out_csv = out_dir / f"benchmark_{self.config.version}.csv"
 
-        df = pd.DataFrame([
-            {"Field": f,
-             "Precision": m["precision"],
-             "Recall": m["recall"],
-             "F1": m["f1_score"]}
-            for f, m in self.field_metrics.items()
-        ])
-        df.to_csv(out_csv, index=False)
-        with open(out_json, "w", encoding="utf-8") as f:
-            json.dump({
-                "metadata": self.environment_details,
-                "schema_compliance": schema_report,
-                "metrics": self.field_metrics,
-                "diagnostics": diagnostics,
-                "overall_accuracy": acc
-            }, f, indent=2)
+        with open(out_csv, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f, lineterminator="\n")
+            w.writerow(("Field", "Precision", "Recall", "F1"))
+            for name, m in self.field_metrics.items():
+                w.writerow((name, m["precision"], m["recall"], m["f1_score"]))
+        payload = {
+            "metadata": self.environment_details,
+            "schema_compliance": schema_report,
+            "metrics": self.field_metrics,
+            "diagnostics": diagnostics,
+            "overall_accuracy": acc
+        }
+        if orjson is not None:
+            out_json.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(out_json, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
 
         print(f"Results saved to: {out_json} and {out_csv}")
         return self.field_metrics
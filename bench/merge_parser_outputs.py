@@ -1,14 +1,19 @@
 import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # stdlib json still works, just slower
+    orjson = None
+
 INPUT_DIR = Path("bench/parser_outputs")
 OUTPUT_FILE = Path("bench/parser_output_consent_v0.1.json")
 
 all_records = {}
 
 for path in INPUT_DIR.glob("*.json"):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    raw = path.read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
     # infer consent ID from filename 
     # e.g. "consent_T1_gen1_nih_consent.json" → "consent_T1_gen1"
@@ -17,7 +22,10 @@ for path in INPUT_DIR.glob("*.json"):
 
     all_records[consent_id] = data
 
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    json.dump(all_records, f, indent=2)
+if orjson is not None:
+    OUTPUT_FILE.write_bytes(orjson.dumps(all_records, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+else:
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(all_records, f, indent=2)
 
 print(f"Merged {len(all_records)} parser outputs into {OUTPUT_FILE}")
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def exact_match(pred, truth):
@@ -16,7 +17,7 @@ def cell_match_rate(pred_df: pd.DataFrame, gt_df: pd.DataFrame):
     c = min(pred_df.shape[1], gt_df.shape[1])
     if r == 0 or c == 0:
         return 0.0
-    pred = pred_df.iloc[:r, :c].astype(str).applymap(str.strip)
-    gt = gt_df.iloc[:r, :c].astype(str).applymap(str.strip)
-    correct = (pred.values == gt.values).sum()
-    return correct / (r * c)
+    pred = np.char.strip(pred_df.iloc[:r, :c].to_numpy(dtype=str))
+    gt = np.char.strip(gt_df.iloc[:r, :c].to_numpy(dtype=str))
+    correct = (pred == gt).sum()
+    return float(correct) / (r * c)
@@ -1,18 +1,78 @@
 from pathlib import Path
 import re
-import pdfplumber
-from pdfminer.high_level import extract_text
+import time
+
+try:
+    import hyperscan  # optional: multi-pattern DFA scan, see _hyperscan_db()
+except ImportError:
+    hyperscan = None
 
 # running the comparison again using Minna’s regex (you have the code already, just change the regex used)
+# (label, separator, value) per field. Labels start on a word boundary and
+# share their literal prefix so the engine commits to e.g. "invoice" once.
+_FIELD_PARTS = {
+    "invoice_number": (r"\b(?:invoice\s*(?:id|#|no\.?)|inv\s*id)", r"[:\s]*", r"[A-Za-z0-9\-]+"),
+    "patient_id": (r"\b(?:patient|pt)\s*id", r"[:\s]*", r"[A-Za-z0-9\-]+"),
+    "invoice_date": (r"\b(?:invoice\s*)?date", r"[:\s]*", r"[0-9]{4}-[0-9]{2}-[0-9]{2}|[0-9]{2}/[0-9]{2}/[0-9]{4}"),
+    "subtotal_amount": (r"\bsub\s*total", r"[:\s]*\$?\s*", r"[0-9]+(?:\.[0-9]{2})?"),
+    "total_amount": (r"\b(?:total\s*amount|amount\s*due)", r"[:\s]*\$?\s*", r"[0-9]+(?:\.[0-9]{2})?"),
+}
 FIELD_PATTERNS = {
-    "invoice_number": re.compile(r"(invoice\s*id|invoice\s*#|inv\s*id|invoice\s*no\.?)[:\s]*([A-Za-z0-9\-]+)", re.IGNORECASE),
-    "patient_id": re.compile(r"(patient\s*id|pt\s*id)[:\s]*([A-Za-z0-9\-]+)", re.IGNORECASE),
-    "invoice_date": re.compile(r"(invoice\s*date|date)[:\s]*([0-9]{4}-[0-9]{2}-[0-9]{2}|[0-9]{2}/[0-9]{2}/[0-9]{4})", re.IGNORECASE),
-    "subtotal_amount": re.compile(r"(subtotal|sub\s*total)[:\s]*\$?\s*([0-9]+(?:\.[0-9]{2})?)", re.IGNORECASE),
-    "total_amount": re.compile(r"(total\s*amount|amount\s*due)[:\s]*\$?\s*([0-9]+(?:\.[0-9]{2})?)", re.IGNORECASE)
+    key: re.compile(f"({label}){sep}({value})", re.IGNORECASE)
+    for key, (label, sep, value) in _FIELD_PARTS.items()
 }
+AMOUNT_FIELDS = frozenset({"subtotal_amount", "total_amount"})
+
+_FIELD_KEYS = tuple(_FIELD_PARTS)
+# (database, bytes twins of FIELD_PATTERNS), built once and only when Hyperscan is used
+_hs_state = None
+
+
+def _hyperscan_state():
+    """Compile all field patterns into one Hyperscan database on first use.
+
+    Hyperscan reports byte offsets into the UTF-8 text, so values are read
+    back with bytes versions of FIELD_PATTERNS compiled alongside it.
+    """
+    global _hs_state
+    if _hs_state is None:
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[FIELD_PATTERNS[key].pattern.encode() for key in _FIELD_KEYS],
+            ids=list(range(len(_FIELD_KEYS))),
+            flags=[flags] * len(_FIELD_KEYS),
+        )
+        byte_patterns = tuple(re.compile(FIELD_PATTERNS[key].pattern.encode(), re.IGNORECASE)
+                              for key in _FIELD_KEYS)
+        _hs_state = (db, byte_patterns)
+    return _hs_state
+
+
+def _extract_fields_hyperscan(text: str):
+    """Hyperscan finds where each field starts; `re` only re-matches there for the value."""
+    data = (text or "").encode("utf-8")
+    starts = {}
+
+    def on_match(idx, start, end, flags, context):
+        if start < starts.get(idx, len(data) + 1):
+            starts[idx] = start
+
+    db, byte_patterns = _hyperscan_state()
+    db.scan(data, match_event_handler=on_match)
+
+    out = dict.fromkeys(_FIELD_KEYS)
+    for idx, start in starts.items():
+        key = _FIELD_KEYS[idx]
+        m = byte_patterns[idx].match(data, start)
+        if not m:
+            continue
+        val = m.group(2).decode("utf-8")
+        out[key] = float(val) if key in AMOUNT_FIELDS else val.strip()
+    return out
 
 def parse_with_pdfplumber(pdf_path: Path) -> str:
+    import pdfplumber  # imported on use, like camelot/tabula in table_extract
     text = []
     with pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
@@ -20,38 +80,62 @@ def parse_with_pdfplumber(pdf_path: Path) -> str:
     return "\n".join(text)
 
 def parse_with_pdfminer(pdf_path: Path) -> str:
-    return extract_text(str(pdf_path)) or ""
+    from pdfminer.high_level import extract_text
+    # pdfplumber takes a path or a binary stream as-is; pdfminer needs str paths
+    src = pdf_path if hasattr(pdf_path, "read") else str(pdf_path)
+    return extract_text(src) or ""
 
 def extract_fields(text: str):
-    out = {"invoice_number": None, "patient_id": None, "invoice_date": None, "subtotal_amount": None, "total_amount": None}
+    if hyperscan is not None:
+        return _extract_fields_hyperscan(text)
+    out = dict.fromkeys(_FIELD_KEYS)
+    # One search per field rather than a single alternation: a combined scan
+    # consumes text, so one field's value could swallow the next field's label
+    # (e.g. "Invoice #\nDate: 2024-01-02") and results would differ from the
+    # Hyperscan path.
     for key, pat in FIELD_PATTERNS.items():
         m = pat.search(text or "")
         if not m:
             continue
-        # Use group 2 for the captured value (all patterns have 2 groups)
-        val = m.group(2) if len(m.groups()) >= 2 else m.group(0)
-        
-        if key in ["subtotal_amount", "total_amount"]:
-            out[key] = float(val) if val else None
-        else:
-            out[key] = val.strip() if val else None
+        val = m.group(2)
+        out[key] = float(val) if key in AMOUNT_FIELDS else val.strip()
     return out
 
+def _append_line_items(tables, line_items):
+    for table in tables:
+        for row in table:
+            # Example: row = [code, description, amount]
+            try:
+                code, description, amount = row
+                line_items.append({
+                    "code": code.strip(),
+                    "description": description.strip(),
+                    "amount": float(amount.replace("$", "").strip())
+                })
+            except Exception:
+                continue
+
 def extract_line_items(pdf_path: Path):
+    import pdfplumber
     line_items = []
     with pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
-            tables = page.extract_tables()
-            for table in tables:
-                for row in table:
-                    # Example: row = [code, description, amount]
-                    try:
-                        code, description, amount = row
-                        line_items.append({
-                            "code": code.strip(),
-                            "description": description.strip(),
-                            "amount": float(amount.replace("$", "").strip())
-                        })
-                    except Exception:
-                        continue
+            _append_line_items(page.extract_tables(), line_items)
     return line_items
+
+def parse_and_extract(pdf_path: Path):
+    """parse_with_pdfplumber + extract_line_items over a single open of the PDF.
+
+    Returns (text, line_items, text_ns), where text_ns covers opening the PDF
+    and extracting its text only, so it stays comparable to the other engines.
+    """
+    import pdfplumber
+    text, line_items = [], []
+    t0 = time.perf_counter_ns()
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            text.append(page.extract_text() or "")
+        text_ns = time.perf_counter_ns() - t0
+        for page in pdf.pages:
+            _append_line_items(page.extract_tables(), line_items)
+    return "\n".join(text), line_items, text_ns
@@ -0,0 +1,11 @@
+from parsers import extract_fields
+
+
+def test_value_does_not_swallow_next_label():
+    out = extract_fields("Invoice #\nDate: 2024-01-02")
+    assert out["invoice_date"] == "2024-01-02"
+
+
+def test_label_after_empty_value_still_matches():
+    out = extract_fields("Invoice No: Patient ID: 55")
+    assert out["patient_id"] == "55"
@@ -1,8 +1,61 @@
+import mmap
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from pdfminer.high_level import extract_text
 import pandas as pd
 
+TRIAGE_WORKERS = os.cpu_count() or 1
+
+# Content-stream scan: strings shown by Tj / ' / " or inside a TJ array
+_STREAM_RE = re.compile(rb"stream\r?\n(.*?)endstream", re.S)
+_SHOW_RE = re.compile(rb"\[([^\]]*)\]\s*TJ|(\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>)\s*(?:Tj|'|\")")
+_STRING_RE = re.compile(rb"\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>")
+_SKIP_STREAM_MARKERS = (b"/Image", b"/DCTDecode", b"/JPXDecode", b"/Length1", b"/Length2")
+
+
+def _shown_chars(content: bytes) -> int:
+    """Rough count of non-blank characters drawn by text-showing operators."""
+    total = 0
+    for m in _SHOW_RE.finditer(content):
+        for s in _STRING_RE.findall(m.group(1) or m.group(2)):
+            if s[:1] == b"(":
+                total += len(s[1:-1].strip())
+            else:  # hex string; assume 2-byte glyph codes to stay conservative
+                total += sum(c in b"0123456789abcdefABCDEF" for c in s) // 4
+    return total
+
+
+def _scan_text_operators(pdf_path: Path, min_chars: int) -> bool:
+    """True once the raw content streams show >= min_chars; False if inconclusive."""
+    with open(pdf_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        seen = 0
+        for m in _STREAM_RE.finditer(buf):
+            head = buf[max(0, m.start() - 256):m.start()]
+            if any(marker in head for marker in _SKIP_STREAM_MARKERS):
+                continue
+            data = m.group(1)
+            if b"/FlateDecode" in head:
+                try:
+                    data = zlib.decompressobj().decompress(data)
+                except zlib.error:
+                    continue
+            seen += _shown_chars(data)
+            if seen >= min_chars:
+                return True
+    return False
+
+
 def has_embedded_text(pdf_path: Path, min_chars: int = 30) -> bool:
+    # Cheap byte scan first; only run full pdfminer extraction when it is
+    # inconclusive (encrypted, unusual filters, object streams, scans).
+    try:
+        if _scan_text_operators(pdf_path, min_chars):
+            return True
+    except (OSError, ValueError):
+        pass
+    from pdfminer.high_level import extract_text
     try:
         txt = extract_text(str(pdf_path)) or ""
         return len(txt.strip()) >= min_chars
@@ -16,18 +69,21 @@ def triage_folder(pdf_dir: Path, out_csv: Path) -> pd.DataFrame:
     - DIGITAL       -> embedded text present (>= min_chars)
     - SCANNED_PDF   -> no embedded text (likely scanned/image-only or corrupted)
     """
-    rows = []
-    for pdf in sorted(pdf_dir.glob("*.pdf")):
-        embedded = has_embedded_text(pdf)
-        status = "DIGITAL" if embedded else "SCANNED_PDF"
-        taxonomy_tag = "doc.type=digital" if embedded else "doc.type=scanned"
-        rows.append({
-            "filename": pdf.name,
-            "embedded_text": embedded,
-            "triage_status": status,
-            "taxonomy_tag": taxonomy_tag,
-        })
-    df = pd.DataFrame(rows)
+    pdfs = sorted(pdf_dir.glob("*.pdf"))
+    # pdfminer extraction is CPU-bound and independent per file
+    if pdfs:
+        with ProcessPoolExecutor(max_workers=min(TRIAGE_WORKERS, len(pdfs))) as ex:
+            results = list(ex.map(has_embedded_text, pdfs, chunksize=4))
+    else:
+        results = []
+
+    # Column lists rather than one dict per row
+    df = pd.DataFrame({
+        "filename": [pdf.name for pdf in pdfs],
+        "embedded_text": results,
+        "triage_status": ["DIGITAL" if e else "SCANNED_PDF" for e in results],
+        "taxonomy_tag": ["doc.type=digital" if e else "doc.type=scanned" for e in results],
+    })
     out_csv.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(out_csv, index=False)
     return df
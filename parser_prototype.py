@@ -337,8 +337,17 @@ def parse_invoice(prepped_text: str, page) -> dict:
     return data
 
 def parse_pdf_bytes(pdf_bytes: bytes) -> dict:
+    return parse_pdf_stream(BytesIO(pdf_bytes))
+
+def parse_pdf_path(pdf_path: str) -> dict:
+    with open(pdf_path, "rb") as fh:
+        return parse_pdf_stream(fh)
+
+def parse_pdf_stream(stream) -> dict:
+    """Same as parse_pdf_bytes but reads from a seekable binary file object,
+    so an upload spooled to disk is parsed without loading it into memory."""
     try:
-        with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        with pdfplumber.open(stream) as pdf:
             page = pdf.pages[0]
             raw_text = page.extract_text()
             if not raw_text: